@@ -1671,7 +1671,7 @@ str, {'internal', 'external'}
 
         # build rotation matrix from file
         frequency_spectrum = np.load(
-            config_utils.basicConfig['file.GSM_spectrum'])
+            config_utils.basicConfig.resolve('file.GSM_spectrum'))
         assert np.all(frequency_spectrum['dipole']
                       == config_utils.basicConfig['params.dipole']), \
             "GSM rotation coefficients not compatible with the chosen dipole."
@@ -1878,7 +1878,7 @@ str, {'internal', 'external'}
 
         # load the Fourier spectrum of the coordinate transformation from file
         frequency_spectrum = np.load(
-            config_utils.basicConfig['file.SM_spectrum'])
+            config_utils.basicConfig.resolve('file.SM_spectrum'))
         assert np.all(frequency_spectrum['dipole']
                       == config_utils.basicConfig['params.dipole']), \
             ("Coefficients for the SM coordinate transformation are not " +
@@ -1887,7 +1887,7 @@ str, {'internal', 'external'}
         if rc is None:
 
             default = config_utils.basicConfig.defaults['file.RC_index'][0]
-            file = config_utils.basicConfig['file.RC_index']
+            file = config_utils.basicConfig.resolve('file.RC_index')
 
             if file == default:
                 warnings.warn(
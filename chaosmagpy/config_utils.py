@@ -79,13 +79,34 @@ import re
 import json
 import numpy as np
 import warnings
+from types import MappingProxyType
 from contextlib import contextmanager
 
+try:
+    import orjson
+except ImportError:
+    HAS_ORJSON = False
+else:
+    HAS_ORJSON = True
+
 ROOT = os.path.abspath(os.path.dirname(__file__))
 LIB = os.path.join(ROOT, 'lib')
 
+# version string of the form "x.x", e.g. "8.3"
+_VERSION_RE = re.compile(r'^\d+\.\d+', re.ASCII)
+
 
 # copied/inspired by matplotlib.rcsetup
+def check_path(s):
+    """Convert to path string (existence is checked when resolved)."""
+    if s is None or s == 'None':
+        return None
+    try:
+        return os.fspath(s)
+    except TypeError:
+        raise ValueError(f'Could not convert {s} to path.')
+
+
 def check_path_exists(s):
     """Check that path to file exists."""
     if s is None or s == 'None':
@@ -96,105 +117,230 @@ def check_path_exists(s):
         raise FileNotFoundError(f'{s} does not exist.')
 
 
-def check_float(s):
-    """Convert to float."""
-    try:
-        return float(s)
-    except ValueError:
-        raise ValueError(f'Could not convert {s} to float.')
+def _make_check(cls, name):
+    """Create function that converts input to type ``cls``."""
 
+    def check(s):
+        if type(s) is cls:  # already correct type
+            return s
+        try:
+            return cls(s)
+        except (TypeError, ValueError):
+            raise ValueError(f'Could not convert {s} to {name}.')
 
-def check_int(s):
-    """Convert to integer."""
-    try:
-        return int(s)
-    except ValueError:
-        raise ValueError(f'Could not convert {s} to integer.')
+    check.__doc__ = f'Convert to {name}.'
 
+    return check
 
-def check_string(s):
-    """Convert to string."""
-    try:
-        return str(s)
-    except ValueError:
-        raise ValueError(f'Could not convert {s} to string.')
+
+check_float = _make_check(float, 'float')
+check_int = _make_check(int, 'integer')
+check_string = _make_check(str, 'string')
 
 
-def check_vector(s, len=None):
-    """Check that input is vector of required length."""
+def check_vector(s, size=None):
+    """Check that input is vector of required size."""
+
+    # already a vector of the right size: read-only arrays (e.g. defaults) are
+    # shared without copying, writable ones are copied to avoid aliasing
+    if (isinstance(s, np.ndarray) and s.ndim == 1
+            and (size is None or s.size == size)):
+        if s.flags.writeable:
+            return np.array(s, dtype=np.float64)
+        return np.ascontiguousarray(s, dtype=np.float64)
+
+    # fail early on sequences of wrong length before creating the array
+    if size is not None and isinstance(s, (list, tuple)) and len(s) != size:
+        raise ValueError(
+            f'Not a valid vector. Wrong length: {len(s)} != {size}.')
+
     try:
-        s = np.array(s)
-        assert s.ndim == 1
-        if len is not None:
-            if s.size != len:
-                raise ValueError(f'Wrong length: {s.size} != {len}.')
-        return s
-    except Exception as err:
+        s = np.asarray(s, dtype=np.float64)
+    except (TypeError, ValueError) as err:
         raise ValueError(f'Not a valid vector. {err}')
 
+    if s.ndim != 1:
+        raise ValueError(f'Not a valid vector. Wrong dimension: {s.ndim}.')
+
+    if size is not None and s.size != size:
+        raise ValueError(
+            f'Not a valid vector. Wrong length: {s.size} != {size}.')
+
+    return s
+
 
 def check_version_string(s):
     """Check correct format of version string."""
 
     s = check_string(s)
 
-    match = re.search(r'\d+\.\d+', s)
-    if match:
+    if _VERSION_RE.match(s):
         return s
     else:
         raise ValueError(f'Not supported version format "{s}".'
                          'Must be of the form "x.x" with x an integer.')
 
 
-DEFAULTS = {
-    'params.r_surf': [6371.2, check_float],
-    'params.r_cmb': [3485.0, check_float],
-    'params.dipole': [np.array([-29442.0, -1501.0, 4797.1]),
-                      lambda x: check_vector(x, len=3)],
-    'params.ellipsoid': [np.array([6378.137, 6356.752]),
-                         lambda x: check_vector(x, len=2)],
-    'params.CHAOS_version': ['8.3', check_version_string],
-    'params.cdf_to_mjd': [730485, check_int],
+_DEFAULT_VALUES = {
+    'params.r_surf': 6371.2,
+    'params.r_cmb': 3485.0,
+    'params.dipole': np.array([-29442.0, -1501.0, 4797.1]),
+    'params.ellipsoid': np.array([6378.137, 6356.752]),
+    'params.CHAOS_version': '8.3',
+    'params.cdf_to_mjd': 730485,
+
+    # location of coefficient files
+    'file.RC_index': os.path.join(LIB, 'RC_index.h5'),
+    'file.GSM_spectrum': os.path.join(LIB, 'frequency_spectrum_gsm.npz'),
+    'file.SM_spectrum': os.path.join(LIB, 'frequency_spectrum_sm.npz'),
+    'file.Earth_conductivity': os.path.join(LIB, 'Earth_conductivity.dat'),
+    'file.shp_coastline': os.path.join(LIB, 'ne_110m_coastline.zip'),
+
+    # plot related configuration
+    'plots.figure_width': 6.3,
+}
+
+_VALIDATORS = {
+    'params.r_surf': check_float,
+    'params.r_cmb': check_float,
+    'params.dipole': lambda x: check_vector(x, size=3),
+    'params.ellipsoid': lambda x: check_vector(x, size=2),
+    'params.CHAOS_version': check_version_string,
+    'params.cdf_to_mjd': check_int,
 
     # location of coefficient files
-    'file.RC_index': [os.path.join(LIB, 'RC_index.h5'),
-                      check_path_exists],
-    'file.GSM_spectrum': [os.path.join(LIB, 'frequency_spectrum_gsm.npz'),
-                          check_path_exists],
-    'file.SM_spectrum': [os.path.join(LIB, 'frequency_spectrum_sm.npz'),
-                         check_path_exists],
-    'file.Earth_conductivity': [os.path.join(LIB, 'Earth_conductivity.dat'),
-                                check_path_exists],
-    'file.shp_coastline': [os.path.join(LIB, 'ne_110m_coastline.zip'),
-                           check_path_exists],
+    'file.RC_index': check_path,
+    'file.GSM_spectrum': check_path,
+    'file.SM_spectrum': check_path,
+    'file.Earth_conductivity': check_path,
+    'file.shp_coastline': check_path,
 
     # plot related configuration
-    'plots.figure_width': [6.3, check_float],
+    'plots.figure_width': check_float,
 }
 
+# protect default arrays from being modified through the configuration
+for _value in _DEFAULT_VALUES.values():
+    if isinstance(_value, np.ndarray):
+        _value.setflags(write=False)
+
+# kept for backwards compatibility: dictionary of [value, validator]
+DEFAULTS = {key: [value, _VALIDATORS[key]]
+            for key, value in _DEFAULT_VALUES.items()}
+
+
+def _copy_default(value):
+    """Return a writeable copy of default arrays, other values unchanged."""
+    if isinstance(value, np.ndarray):
+        return value.copy()
+    return value
+
 
 class BasicConfig(dict):
     """Class for creating CHAOS configuration dictionary."""
 
     defaults = DEFAULTS
 
+    _default_values = _DEFAULT_VALUES
+    _validators = _VALIDATORS
+
+    # checked values of scalar inputs, e.g. when toggled with context()
+    _check_cache = {}
+    _check_cache_maxsize = 256
+
     def __init__(self, *args, **kwargs):
         super().update(*args, **kwargs)
 
     def __setitem__(self, key, value):
         """Set and check value before updating dictionary."""
+        dict.__setitem__(self, key, self._check(key, value))
 
-        try:
+    def _check(self, key, value):
+        """Return the checked value of a key without setting it."""
+
+        # only cache immutable scalars, arrays and lists can change in-place
+        cacheable = type(value) in (int, float, str)
+        if cacheable:
+            cache_key = (key, type(value), value)
             try:
-                cval = self.defaults[key][1](value)
-            except ValueError as err:
-                raise ValueError(f'Key "{key}": {err}')
-            super().__setitem__(key, cval)
-        except KeyError:
+                return self._check_cache[cache_key]
+            except KeyError:
+                pass
+
+        check = self._validators.get(key)
+        if check is None:
             raise KeyError(f'"{key}" is not a valid parameter.')
 
+        try:
+            cval = check(value)
+        except ValueError as err:
+            raise ValueError(f'Key "{key}": {err}')
+
+        if cacheable:
+            if len(self._check_cache) >= self._check_cache_maxsize:
+                self._check_cache.clear()
+            self._check_cache[cache_key] = cval
+
+        return cval
+
     def __str__(self):
-        return '\n'.join(map('{0[0]}: {0[1]}'.format, sorted(self.items())))
+        return '\n'.join(f'{key}: {self[key]}' for key in sorted(self))
+
+    def snapshot(self):
+        """
+        Return read-only copy of the current configuration.
+
+        The snapshot is not affected by later changes to the configuration,
+        which makes it useful to look up values once outside of loops. Array
+        values are copied into read-only arrays unless they are read-only
+        already.
+
+        Returns
+        -------
+        snapshot : :class:`types.MappingProxyType`
+            Read-only mapping of the configuration keys and values.
+
+        """
+
+        snapshot = dict(self)
+
+        for key, value in snapshot.items():
+            if isinstance(value, np.ndarray) and value.flags.writeable:
+                value = value.copy()
+                value.setflags(write=False)
+                snapshot[key] = value
+
+        return MappingProxyType(snapshot)
+
+    def resolve(self, key):
+        """
+        Return the filepath stored under a file keyword.
+
+        The existence of the file is checked on every call, when the file is
+        actually needed, and not when the keyword is set.
+
+        Parameters
+        ----------
+        key : str
+            BasicConfig file keyword, e.g. ``'file.RC_index'``.
+
+        Returns
+        -------
+        filepath : str
+            Filepath to the existing file.
+
+        Raises
+        ------
+        FileNotFoundError
+            If the file does not exist.
+
+        """
+        filepath = self.__getitem__(key)
+
+        if filepath is not None and not os.path.isfile(filepath):
+            raise FileNotFoundError(f'{filepath} is not an existing file.')
+
+        return filepath
 
     def reset(self, key):
         """
@@ -206,19 +352,23 @@ class BasicConfig(dict):
             Single keyword that is reset to the default.
 
         """
-        self.__setitem__(key, self.defaults[key][0])
+        self.__setitem__(key, _copy_default(self._default_values[key]))
 
     def fullreset(self):
         """
         Load all default values.
 
         """
-        super().update({key: val for key, (val, _) in self.defaults.items()})
+        dict.update(self, {key: _copy_default(value)
+                           for key, value in self._default_values.items()})
 
     def load(self, filepath):
         """
         Load configuration dictionary from file.
 
+        All values are checked before the configuration dictionary is
+        updated, so that an invalid file leaves the dictionary unchanged.
+
         Parameters
         ----------
         filepath : str
@@ -226,16 +376,22 @@ class BasicConfig(dict):
 
         """
 
-        with open(filepath, 'r') as f:
-            kwargs = json.load(f)
+        if HAS_ORJSON:
+            with open(filepath, 'rb') as f:
+                kwargs = orjson.loads(f.read())
+        else:
+            with open(filepath, 'r') as f:
+                kwargs = json.load(f)
 
         if len(kwargs) == 0:
             warnings.warn(
                 'Configuration dictionary loaded from file is empty.')
 
-        for key, value in kwargs.items():
-            # check format and set key value pairs
-            self.__setitem__(key, value)
+        # check format of all key value pairs before updating
+        checked = {key: self._check(key, value)
+                   for key, value in kwargs.items()}
+
+        dict.update(self, checked)
 
     def save(self, filepath):
         """
@@ -249,12 +405,19 @@ class BasicConfig(dict):
 
         """
 
-        def default(obj):
-            if isinstance(obj, np.ndarray):
-                return obj.tolist()
+        if HAS_ORJSON:
+            # numpy arrays are serialized natively
+            option = (orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS
+                      | orjson.OPT_SERIALIZE_NUMPY)
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(dict(self), option=option))
+        else:
+            def default(obj):
+                if isinstance(obj, np.ndarray):
+                    return obj.tolist()
 
-        with open(filepath, 'w') as f:
-            json.dump(self, f, default=default, indent=4, sort_keys=True)
+            with open(filepath, 'w') as f:
+                json.dump(self, f, default=default, indent=2, sort_keys=True)
 
         print(f'Saved configuration textfile to {filepath}.')
 
@@ -291,16 +454,21 @@ class BasicConfig(dict):
         """
         old_value = self.__getitem__(key)
         self.__setitem__(key, value)
-        yield
-        self.__setitem__(key, old_value)
+        try:
+            yield
+        finally:
+            # old value was already checked, restore even if an error occurs
+            dict.__setitem__(self, key, old_value)
 
 
-# load defaults
-basicConfig = BasicConfig({key: val for key, (val, _) in DEFAULTS.items()})
+# load defaults (already valid, no need to check them)
+basicConfig = BasicConfig()
+basicConfig.fullreset()
 
 
 if __name__ == '__main__':
     # ensure default passes tests
-    for key, (value, test) in DEFAULTS.items():
+    for key, value in _DEFAULT_VALUES.items():
+        test = _VALIDATORS[key]
         if not np.all(test(value) == value):
             print(f"{key}: {test(value)} != {value}")
@@ -75,7 +75,10 @@ MAG : Magnetic coordinate system (centered dipole, orthogonal)
 
 import numpy as np
 import os
+import math
+import cmath
 from math import factorial
+from functools import lru_cache
 from . import model_utils
 from . import config_utils
 from . import data_utils
@@ -87,10 +90,18 @@ except ImportError:
 else:
     HAS_APX = True
 
+try:
+    import numba
+except ImportError:
+    HAS_NUMBA = False
+else:
+    HAS_NUMBA = True
+
 
 ROOT = os.path.abspath(os.path.dirname(__file__))
 
 
+@lru_cache(maxsize=None)
 def igrf_dipole(epoch=None):
     """
     Compute unit vector that is anti-parallel to the IGRF dipole.
@@ -108,7 +119,7 @@ def igrf_dipole(epoch=None):
     -------
     dipole : ndarray, shape (3,)
         Unit vector pointing to geomagnetic north pole (located in Northern
-        Hemisphere).
+        Hemisphere). The array is cached and read-only.
 
     """
 
@@ -132,6 +143,8 @@ def igrf_dipole(epoch=None):
                          '"2015" (IGRF-12), and "2020" '
                          '(IGRF-13) are supported.')
 
+    dipole.setflags(write=False)  # shared between calls
+
     return dipole
 
 
@@ -183,6 +196,20 @@ def _dipole_to_unit(*args):
     return vector
 
 
+@lru_cache(maxsize=8)
+def _config_dipole_to_unit(coeffs):
+    """
+    Cached, read-only unit vector of the dipole coefficients (tuple) in
+    ``basicConfig['params.dipole']``.
+
+    """
+
+    vec = _dipole_to_unit(np.array(coeffs))
+    vec.setflags(write=False)  # shared between calls
+
+    return vec
+
+
 def dipole_to_vec(dipole=None):
     """
     Convert degree-1 SH coefficients or geomagnetic north pole positions to
@@ -203,12 +230,14 @@ def dipole_to_vec(dipole=None):
     -------
     vec : ndarray, shape (..., 3)
         Unit vector pointing in the direction of the geomagnetic north pole.
+        If ``dipole`` is not given, the array is cached and read-only.
 
     """
 
     if dipole is None:
         # take [g10, g11, h11]-format in the config dictionary
-        vec = _dipole_to_unit(config_utils.basicConfig['params.dipole'])
+        vec = _config_dipole_to_unit(
+            tuple(config_utils.basicConfig['params.dipole']))
     elif isinstance(dipole, (tuple, list)):
         # unpack: accepts either two arrays (theta_np and phi_np), or
         # three arrays (one for each coefficient: g10, g11, h11)
@@ -236,12 +265,13 @@ def dipole_tilt(time):
 
     """
 
-    s = sun_position(time)  # theta and phi position
-    s = np.stack(spherical_to_cartesian(1., s[0], s[1]), axis=-1)
+    theta, phi = sun_position(time)
+    sx, sy, sz = spherical_to_cartesian(1., theta, phi)
 
     m = igrf_dipole()
 
-    return np.degrees(np.arcsin(np.matmul(s, m)))
+    # dot product of sun position and dipole without stacking the components
+    return np.degrees(np.arcsin(sx*m[0] + sy*m[1] + sz*m[2]))
 
 
 def clock_angle(By, Bz):
@@ -306,13 +336,16 @@ def coupling_Newell(By, Bz, Vx):
 
     """
 
-    B = np.sqrt(By**2 + Bz**2)
-    ca = np.radians(clock_angle(By, Bz))
+    # common factor of both functions, note that B**(2/3) = (B**2)**(1/3)
+    common = np.abs(Vx)**(4./3) * (By*By + Bz*Bz)**(1./3) / 1e3
 
-    epsilon = np.abs(Vx)**(4./3) * B**(2./3) * np.abs(np.sin(ca/2))**(8./3)
-    tau = np.abs(Vx)**(4./3) * B**(2./3) * np.cos(ca/2)**(8./3)
+    # half of the clock angle in radians
+    half_ca = 0.5*np.arctan2(By, Bz)
 
-    return epsilon/1e3, tau/1e3
+    epsilon = common * np.abs(np.sin(half_ca))**(8./3)
+    tau = common * np.cos(half_ca)**(8./3)
+
+    return epsilon, tau
 
 
 def synth_rotate_gauss(time, frequency, spectrum, scaled=None):
@@ -349,24 +382,33 @@ def synth_rotate_gauss(time, frequency, spectrum, scaled=None):
     if scaled is None:
         scaled = False
 
-    time = np.array(time[..., None, None, None], dtype=float)
-    frequency = 2*np.pi*np.array(frequency, dtype=float)
-    if frequency.ndim == 1:
-        frequency.reshape(-1, 1, 1)
-    spectrum = np.array(spectrum, dtype=complex)
+    time = np.asarray(time, dtype=float)
+    frequency = np.array(frequency, dtype=float)  # copy, modified in-place
+    frequency *= 2*np.pi
+    spectrum = np.array(spectrum, dtype=complex)  # copy, modified in-place
 
-    # output of shape (..., k, n, m)
-    freq_t = frequency*time
+    if scaled is False:
+        # scale non-offset coefficients by 2 before synthesizing matrices,
+        # done once on the spectrum instead of for every point in time
+        scale = np.where(frequency > 0.0, 2., 1.)
+        if scale.ndim == 1:
+            scale = scale[:, None, None]
+        spectrum *= scale
 
-    # compute complex exponentials
-    harmonics = np.empty(freq_t.shape, dtype=complex)
-    harmonics = np.cos(freq_t) + 1j*np.sin(freq_t)
+    if frequency.ndim == 1:
+        # same frequencies for all matrix elements, output of shape (..., k)
+        freq_t = np.multiply.outer(time, frequency)
+        subscripts = '...k,kmn->...mn'
+    else:
+        # frequencies of each matrix element, output of shape (..., k, m, n)
+        freq_t = frequency*time[..., None, None, None]
+        subscripts = '...kmn,kmn->...mn'
 
-    if scaled is False:
-        # scale non-offset coefficients by 2 before synthesizing matrices
-        harmonics = np.where(frequency > 0.0, 2*harmonics, harmonics)
+    # compute complex exponentials
+    harmonics = np.exp(1j*freq_t)
 
-    matrix = np.sum(spectrum*harmonics, axis=-3)
+    # multiply with spectrum and sum over frequencies in a single pass
+    matrix = np.einsum(subscripts, harmonics, spectrum)
 
     return np.real(matrix)
 
@@ -504,16 +546,23 @@ shape (``filter``, ``nmax`` (``nmax`` + 2), ``kmax`` (``kmax`` + 2))
     # compute transformation matrix: reference to geographic system
     matrix_time = rotate_gauss(nmax, kmax, base_1, base_2, base_3)
 
-    # DFT and proper scaling
-    spectrum_full = np.fft.fft(matrix_time, axis=0) / N
-    spectrum_full = spectrum_full[:int(N/2+1)]  # remove aliases
+    # DFT and proper scaling of all matrix elements in one call, the matrices
+    # are real, so only compute the first half of the spectrum (no aliases)
+    spectrum_full = np.fft.rfft(matrix_time, axis=0, norm='forward')
+
+    # move frequencies into the last dimension, so that the spectrum of each
+    # matrix element is contiguous in memory, shape (Nk, Nl, N/2+1)
+    spectrum_full = np.ascontiguousarray(np.moveaxis(spectrum_full, 0, -1))
 
     # oscillations per second
     frequency_full = (np.arange(int(N/2+1)) / N) / step / 3600
 
     if qfunc is None:
-        # compute q-response and keep in memory
-        q = q_response(frequency_full, nmax)
+        # compute q-response (or reuse it from previous calls with the same
+        # sampling and conductivity model) and keep in memory
+        filepath = config_utils.basicConfig.resolve('file.Earth_conductivity')
+        q = _q_response_cached(N, step, nmax, filepath,
+                               os.path.getmtime(filepath))
 
         # now define qfunc here
         def qfunc(freq, k):
@@ -521,12 +570,15 @@ shape (``filter``, ``nmax`` (``nmax`` + 2), ``kmax`` (``kmax`` + 2))
             n = np.floor(np.sqrt(k+1)-1).astype(int)
             return q[n]
 
-    # predefine output arrays
-    frequency = np.zeros((filter, nmax*(nmax+2), kmax*(kmax+2)))
-    frequency_ind = np.zeros((filter, nmax*(nmax+2), kmax*(kmax+2)))
-    spectrum = np.zeros((filter, nmax*(nmax+2), kmax*(kmax+2)),
+    # predefine output arrays, frequencies in the last dimension and moved
+    # into the leading dimension after sorting, only the indices of the
+    # sorted frequencies are stored in the loop
+    index = np.zeros((nmax*(nmax+2), kmax*(kmax+2), filter), dtype=np.int32)
+    index_ind = np.zeros((nmax*(nmax+2), kmax*(kmax+2), filter),
+                         dtype=np.int32)
+    spectrum = np.zeros((nmax*(nmax+2), kmax*(kmax+2), filter),
                         dtype=complex)
-    spectrum_ind = np.zeros((filter, nmax*(nmax+2), kmax*(kmax+2)),
+    spectrum_ind = np.zeros((nmax*(nmax+2), kmax*(kmax+2), filter),
                             dtype=complex)
 
     for k in range(nmax*(nmax+2)):
@@ -534,32 +586,38 @@ shape (``filter``, ``nmax`` (``nmax`` + 2), ``kmax`` (``kmax`` + 2))
         # compute Q-response for freqencies and given Gauss coefficient
         response = qfunc(frequency_full, k)
 
-        for ll in range(kmax*(kmax+2)):
-            # select specific Fourier coefficients from the rotation matrix
-            element = spectrum_full[:, k, ll]
-
-            # modify Fourier components with Q-response
-            element_ind = response*element
+        # select Fourier coefficients of all elements in row k of the
+        # rotation matrix at once (view), shape (kmax*(kmax+2), N/2+1)
+        element = spectrum_full[k]
 
-            # index of sorted element spectrum (descending order)
-            sort = np.argsort(np.abs(element))[::-1]
-            sort = sort[:filter]  # only keep small number of components
+        # modify Fourier components with Q-response
+        element_ind = response*element
 
-            # index of sorted element spectrum (descending order)
-            sort_ind = np.argsort(np.abs(element_ind))[::-1]
-            sort_ind = sort_ind[:filter]  # only keep small number
+        # index of sorted element spectra (descending order), only keep
+        # small number of components
+        index[k] = _argsort_descending(np.abs(element), filter)
+        index_ind[k] = _argsort_descending(np.abs(element_ind), filter)
 
-            # write sorted frequency (per day) and fourier components to array
-            frequency[:, k, ll] = frequency_full[sort] * (24*3600)
-            frequency_ind[:, k, ll] = frequency_full[sort_ind] * (24*3600)
-            spectrum[:, k, ll] = element[sort]
-            spectrum_ind[:, k, ll] = element_ind[sort_ind]
+        # write sorted fourier components to array
+        spectrum[k] = np.take_along_axis(element, index[k], axis=-1)
+        spectrum_ind[k] = np.take_along_axis(element_ind, index_ind[k],
+                                             axis=-1)
 
     if scaled:
-        # scale non-offset coefficients by 2
-        spectrum = np.where(frequency == 0.0, spectrum, 2*spectrum)
-        spectrum_ind = np.where(frequency_ind == 0.0, spectrum_ind,
-                                2*spectrum_ind)
+        # scale non-offset coefficients by 2 (index 0 is zero frequency)
+        spectrum *= np.where(index == 0, 1., 2.)
+        spectrum_ind *= np.where(index_ind == 0, 1., 2.)
+
+    # look up sorted frequencies (per day) in a single pass
+    frequency_day = frequency_full * (24*3600)
+    frequency = frequency_day[index]
+    frequency_ind = frequency_day[index_ind]
+
+    # shape (filter, nmax*(nmax+2), kmax*(kmax+2))
+    frequency = np.moveaxis(frequency, -1, 0)
+    frequency_ind = np.moveaxis(frequency_ind, -1, 0)
+    spectrum = np.moveaxis(spectrum, -1, 0)
+    spectrum_ind = np.moveaxis(spectrum_ind, -1, 0)
 
     # save several arrays to binary
     if save_to:
@@ -575,7 +633,35 @@ shape (``filter``, ``nmax`` (``nmax`` + 2), ``kmax`` (``kmax`` + 2))
     return frequency, spectrum, frequency_ind, spectrum_ind
 
 
-def rotate_gauss(nmax, kmax, base_1, base_2, base_3):
+def _argsort_descending(values, size):
+    """
+    Indices of the largest values along the last axis in descending order.
+
+    Parameters
+    ----------
+    values : ndarray, shape (..., N)
+        Real values to be sorted along the last axis.
+    size : int
+        Number of indices to be returned.
+
+    Returns
+    -------
+    index : ndarray, shape (..., ``size``)
+        Indices of the ``size`` largest values in descending order.
+
+    """
+
+    if size >= values.shape[-1]:
+        return np.argsort(-values, axis=-1)[..., :size]
+
+    # partial sort (linear time) and only sort the kept values
+    index = np.argpartition(-values, size-1, axis=-1)[..., :size]
+    order = np.argsort(-np.take_along_axis(values, index, axis=-1), axis=-1)
+
+    return np.take_along_axis(index, order, axis=-1)
+
+
+def rotate_gauss(nmax, kmax, base_1, base_2, base_3, *, precision=None):
     """
     Compute matrices for the coordinate transformation of spherical harmonic
     expansions.
@@ -598,6 +684,11 @@ def rotate_gauss(nmax, kmax, base_1, base_2, base_3):
         Base vectors of rotated reference system given in terms of the
         target reference system. Vectors reside in the last dimension. The base
         vectors are needed for the coordinate transformation.
+    precision : {'double', 'single'}, optional
+        Floating point precision of the spherical harmonics and their FFT on
+        the rotated grid (default is 'double'). With 'single', intermediate
+        arrays use half the memory, while the integration is still carried
+        out in double precision. The output is always in double precision.
 
     Returns
     -------
@@ -611,11 +702,27 @@ def rotate_gauss(nmax, kmax, base_1, base_2, base_3):
 
     """
 
+    if precision is None:
+        precision = 'double'
+
+    if precision == 'double':
+        dtype = np.float64
+    elif precision == 'single':
+        dtype = np.float32
+    else:
+        raise ValueError('Precision must be either "double" or "single".')
+
     assert (base_1.shape == base_2.shape) and (base_1.shape == base_3.shape)
     time_shape = base_1.shape[:-1]  # retain original shape of grid
 
+    # rotation matrices with the base vectors as rows, time dimensions are
+    # flattened into a single batch dimension, shape (n_time, 3, 3)
+    rotation = np.stack([base_1.reshape(-1, 3), base_2.reshape(-1, 3),
+                         base_3.reshape(-1, 3)], axis=1)
+    n_time = rotation.shape[0]
+
     # predefine output array
-    matrix_time = np.empty(time_shape + (nmax**2+2*nmax, kmax**2+2*kmax))
+    matrix_time = np.empty((n_time, nmax**2+2*nmax, kmax**2+2*kmax))
 
     # define Gauss-Legendre grid for surface integration
     n_theta = int((nmax + kmax + 1)/2) + 1  # number of points in colatitude
@@ -626,109 +733,172 @@ def rotate_gauss(nmax, kmax, base_1, base_2, base_3):
     theta = np.degrees(np.arccos(x))
     phi = np.arange(n_phi) * np.degrees(2*np.pi)/n_phi
 
-    # compute Schmidt quasi-normalized associated Legendre functions and
-    # corresponding normalization
+    # compute Schmidt quasi-normalized associated Legendre functions
     Pnm = model_utils.legendre_poly(nmax, theta)
-    n_Pnm = int((nmax**2+3*nmax)/2)
-    norm = np.empty((n_Pnm,))
-    for n in range(1, nmax+1):
-        lower = int((n**2+n)/2-1)
-        upper = int((n**2+3*n)/2)
-        norm[lower] = 2/(2*n+1)  # inner product of Pn0
-        norm[lower+1:upper] = 4/(2*n+1)  # inner product of Pnm m>0
 
-    # generate grid of rotated reference system
+    # generate grid of rotated reference system and its cartesian components
+    # (unit radius), shape (3, n_theta, n_phi)
     phi_grid, theta_grid = np.meshgrid(phi, theta)
+    grid = np.stack(spherical_to_cartesian(1., theta_grid, phi_grid))
+
+    # index tables of the rows (geographic expansion) and columns (rotated
+    # expansion) of the matrix: degree, order and sine flag in natural order
+    row_n, row_m, row_sine = _gauss_index(nmax)
+    col_k, col_l, col_sine = _gauss_index(kmax)
+
+    # normalization of the rows: inner product of Pn0 and Pnm m>0
+    norm = np.where(row_m == 0, 2., 4.) / (2*row_n + 1)
+
+    # factor 2 for m > 0 and normalization of the rows
+    row_scale = np.where(row_m > 0, 2., 1.) / norm
+
+    # Legendre functions (up to order nmax) times the Gauss weights and the
+    # scaling of the rows, built once for all points in time
+    Pnm_weights = np.zeros((nmax+1, nmax+1, n_theta))
+    Pnm_weights[row_n, row_m] = Pnm[row_n, row_m]*weights*row_scale[:, None]
+
+    # number of points in time processed at once (limits memory usage of the
+    # Legendre functions on the rotated grid to about 32 MB)
+    chunk = max(1, 2**22 // ((kmax+1)*(kmax+2)*n_theta*n_phi))
+    chunk = min(chunk, n_time)
 
-    # run over time index and produce matrix for every point in time
-    for index in np.ndindex(time_shape):
+    # orders of the rotated expansion in radians per degree of longitude
+    orders = np.radians(np.arange(kmax+1))
 
-        # predefine array size for each point in time
-        matrix = np.empty((nmax*(nmax+2), kmax*(kmax+2)))
+    # work arrays reused for every chunk: azimuthal angles, their cosine
+    # (index 0) and sine (index 1), and the real spherical harmonics
+    nphi_ref = np.empty((kmax+1, chunk, n_theta, n_phi), dtype=dtype)
+    trig_ref = np.empty((2,) + nphi_ref.shape, dtype=dtype)
+    sh_ref = np.empty((kmax*(kmax+2), chunk, n_theta, n_phi), dtype=dtype)
 
-        theta_ref, phi_ref = geo_to_base(
-            theta_grid, phi_grid, base_1[index], base_2[index], base_3[index])
+    # cosine or sine of the order of each column as index into the work
+    # array with cosine and sine merged into the leading dimension
+    trig_flat = trig_ref.reshape((2*(kmax+1),) + nphi_ref.shape[1:])
+    col_trig = col_sine.astype(int)*(kmax+1) + col_l
+
+    # run over chunks of the time index and produce matrices for all points
+    # in time of the chunk at once, time is the leading dimension
+    for start in range(0, n_time, chunk):
+
+        index = slice(start, start + chunk)
+        size = min(chunk, n_time - start)  # last chunk may be smaller
+
+        # rotate the grid points, one contiguous array per component
+        xyz_ref = np.einsum('tij,jab->itab', rotation[index], grid)
+        _, theta_ref, phi_ref = cartesian_to_spherical(*xyz_ref)
 
         # compute Schmidt quasi-normalized associated Legendre functions on
-        # grid in rotated reference system: theta_ref, phi_ref
+        # grid in rotated reference system: theta_ref, phi_ref, in a single
+        # call for all points in time of the chunk (the chunk size only
+        # limits the memory of the output)
         Pnm_ref = model_utils.legendre_poly(kmax, theta_ref)
 
-        # compute powers of complex exponentials
-        nphi_ref = np.radians(np.multiply.outer(np.arange(kmax+1), phi_ref))
-        exp_ref = np.cos(nphi_ref) + 1j*np.sin(nphi_ref)
+        # compute cosine and sine of multiples of the azimuth
+        np.multiply.outer(orders, phi_ref, out=nphi_ref[:, :size])
+        np.cos(nphi_ref[:, :size], out=trig_ref[0, :, :size])
+        np.sin(nphi_ref[:, :size], out=trig_ref[1, :, :size])
 
-        # loop over columns of matrix
-        col = 0  # index of column
-        for k in range(1, kmax+1):
+        # real spherical harmonics of all columns on the rotated grid:
+        # Pkl*cos(l*phi) or Pkl*sin(l*phi), gathered into the work array
+        np.take(trig_flat, col_trig, axis=0, out=sh_ref, mode='clip')
+        np.multiply(sh_ref[:, :size], Pnm_ref[col_k, col_l],
+                    out=sh_ref[:, :size])
 
-            # l = 0
-            sh_ref = Pnm_ref[k, 0]*exp_ref[0]  # cplx spherical harmonic
-            fft_c = np.fft.fft(sh_ref.real) / n_phi  # only real part non-zero
+        # azimuthal FFT of all columns (real input, so only non-negative
+        # orders), only orders up to nmax are needed
+        fft_ref = np.fft.rfft(sh_ref[:, :size], axis=-1, norm='forward')
+        fft_ref = fft_ref[..., :nmax+1]
 
-            # SH analysis: write column of matrix, row by row
-            row = 0  # index of row
-            for n in range(1, nmax+1):
+        if fft_ref.shape[-1] < nmax+1:
+            # orders above n_phi/2 are not resolved by the grid and vanish
+            # since they exceed the degree kmax of the rotated expansion
+            fft_ref = np.pad(fft_ref, [(0, 0)]*3
+                             + [(0, nmax+1-fft_ref.shape[-1])])
 
-                lower = int((n**2+n)/2-1)  # index for Pnm norm
+        if HAS_NUMBA:
+            # compiled SH analysis, writes directly into output array
+            _sh_analysis_kernel(fft_ref, Pnm_weights, row_n, row_m,
+                                row_sine, matrix_time[index])
+            continue
 
-                #  m = 0: colatitude integration using Gauss weights
-                coeff = np.sum(fft_c[:, 0]*Pnm[n, 0]*weights) / norm[lower]
-                matrix[row, col] = coeff.real
-                row += 1
+        # SH analysis: colatitude integration using Gauss weights of all
+        # columns at once, shape (time, n, m, column)
+        coeffs = np.einsum('ctjm,nmj->tnmc', fft_ref, Pnm_weights,
+                           optimize=True)
+        coeffs = coeffs[:, row_n, row_m]
 
-                # m > 0
-                for m in range(1, n+1):
-                    coeff = (np.sum(2*fft_c[:, m]*Pnm[n, m]*weights) /
-                             norm[lower+m])
-                    matrix[row, col] = coeff.real
-                    matrix[row+1, col] = -coeff.imag
-                    row += 2
+        # write cosine (real) and sine (negative imaginary) parts into rows
+        matrix_time[index] = np.where(row_sine[:, None],
+                                      -coeffs.imag, coeffs.real)
 
-            col += 1  # update index of column
+    return matrix_time.reshape(time_shape + matrix_time.shape[1:])
 
-            # l > 0
-            for ll in range(1, k+1):
-                sh_ref = Pnm_ref[k, ll]*exp_ref[ll]
-                fft_c = np.fft.fft(sh_ref.real) / n_phi
-                fft_s = np.fft.fft(sh_ref.imag) / n_phi
 
-                # SH analysis: write column of R, row by row
-                row = 0  # index of row
-                for n in range(1, nmax+1):
+def _sh_analysis_kernel(fft_ref, Pnm_weights, row_n, row_m, row_sine, out):
+    """
+    Colatitude integration of the azimuthal FFT in :func:`rotate_gauss`.
 
-                    lower = int((n**2+n) / 2-1)  # index for Pnm norm
+    Parameters
+    ----------
+    fft_ref : ndarray, shape (n_col, n_time, n_theta, nmax + 1)
+        Azimuthal FFT of the columns on the Gauss-Legendre grid.
+    Pnm_weights : ndarray, shape (nmax + 1, nmax + 1, n_theta)
+        Legendre functions times the Gauss weights and the scaling of the
+        rows.
+    row_n, row_m, row_sine : ndarray, shape (n_row,)
+        Degree, order and sine flag of the rows.
+    out : ndarray, shape (n_time, n_row, n_col)
+        Output array of the matrices.
 
-                    # cosine part
-                    coeff = np.sum(fft_c[:, 0]*Pnm[n, 0]*weights)/norm[lower]
-                    matrix[row, col] = coeff.real
+    """
 
-                    # sine part
-                    coeff = np.sum(fft_s[:, 0]*Pnm[n, 0]*weights)/norm[lower]
-                    matrix[row, col+1] = coeff.real
+    n_col, n_time, n_theta, _ = fft_ref.shape
 
-                    row += 1  # update row index
+    for col in numba.prange(n_col):
+        for t in range(n_time):
+            for row in range(row_n.size):
+                n = row_n[row]
+                m = row_m[row]
 
-                    # m > 0
-                    for m in range(1, n+1):
-                        # cosine part
-                        coeff = (np.sum(2*fft_c[:, m]*Pnm[n, m]*weights) /
-                                 norm[lower+m])
-                        matrix[row, col] = coeff.real
-                        matrix[row+1, col] = -coeff.imag
+                coeff = 0j
+                for j in range(n_theta):
+                    coeff += fft_ref[col, t, j, m]*Pnm_weights[n, m, j]
 
-                        # sine part
-                        coeff = (np.sum(2*fft_s[:, m]*Pnm[n, m]*weights) /
-                                 norm[lower+m])
-                        matrix[row, col+1] = coeff.real
-                        matrix[row+1, col+1] = -coeff.imag
+                if row_sine[row]:
+                    out[t, row, col] = -coeff.imag
+                else:
+                    out[t, row, col] = coeff.real
 
-                        row += 2  # update row index
 
-                col += 2  # update column index
+if HAS_NUMBA:
+    _sh_analysis_kernel = numba.njit(parallel=True, cache=True)(
+        _sh_analysis_kernel)
 
-        matrix_time[index] = matrix  # write rotation matrix into output
 
-    return matrix_time
+def _gauss_index(nmax):
+    """
+    Degree, order and sine flag of the Gauss coefficients in natural order.
+
+    Parameters
+    ----------
+    nmax : int
+        Maximum degree of the spherical harmonic expansion.
+
+    Returns
+    -------
+    degree, order, sine : ndarray, shape (``nmax`` (``nmax`` + 2),)
+        Degree, order and flag, which is ``True`` for :math:`h_n^m` and
+        ``False`` for :math:`g_n^m`, of each coefficient in the order
+        [g10, g11, h11, g20, ...].
+
+    """
+
+    index = [(n, m, sine) for n in range(1, nmax+1) for m in range(n+1)
+             for sine in ((False,) if m == 0 else (False, True))]
+
+    degree, order, sine = (np.array(a) for a in zip(*index))
+
+    return degree, order, sine
 
 
 def sh_analysis(func, nmax, kmax=None):
@@ -815,7 +985,8 @@ def sh_analysis(func, nmax, kmax=None):
     # evaluate function at grid points
     F = func(theta_grid, phi_grid)
 
-    fft = np.fft.fft(F, axis=0) / n_phi
+    # real input, hence only compute non-negative frequencies
+    fft = np.fft.rfft(F, axis=0) / n_phi
 
     row = 0  # index of row
     for n in range(1, nmax+1):
@@ -868,36 +1039,61 @@ def sun_position(time):
     Geophysical%20Coordinate%20Transformations.htm#appendix2>`_
 
     """
+    if np.ndim(time) == 0:
+        # fast path for a single time without array overhead
+        time = float(time)
+        _check_sun_time(time)
+
+        theta, phi = _sun_position_scalar(time)
+        return np.float64(theta), np.float64(phi)
+
+    _check_sun_time(time)
+
+    if HAS_NUMBA:
+        # compiled elementwise evaluation without temporary arrays
+        return _sun_position_kernel(time)
+
     rad = np.pi / 180
     year = 2000  # reference year for mjd2000
-    assert np.all((year + time // 365.25) < 2099) \
-        and np.all((year - time // 365.25) > 1901), \
-        ("Time must be between 1901 and 2099.")
+
+    time = np.asarray(time, dtype=float)
 
     frac_day = np.remainder(time, 1)  # decimal fraction of a day
-    julian_date = 365 * (year-1900) + (year-1901)//4 + time + 0.5
+    julian_date = time + (365 * (year-1900) + (year-1901)//4 + 0.5)
 
     t = julian_date/36525
-    v = np.remainder(279.696678 + 0.9856473354*julian_date, 360.)
-    g = np.remainder(358.475845 + 0.985600267*julian_date, 360.)
 
-    slong = v + (1.91946 - 0.004789*t)*np.sin(g*rad) + 0.020094*np.sin(2*g*rad)
-    obliq = (23.45229 - 0.0130125*t)
-    slp = (slong - 0.005686)
+    # angles are reduced to [0, 360) in place to avoid temporary arrays
+    v = 0.9856473354*julian_date
+    v += 279.696678
+    np.remainder(v, 360., out=v)
 
-    sind = np.sin(obliq*rad)*np.sin(slp*rad)
-    cosd = np.sqrt(1.-sind**2)
+    g = 0.985600267*julian_date
+    g += 358.475845
+    np.remainder(g, 360., out=g)
+    g *= rad
 
-    #  sun's declination in radians
-    declination = np.arctan(sind/cosd)
+    # apparent longitude and obliquity of the ecliptic in radians
+    slp = (v + (1.91946 - 0.004789*t)*np.sin(g) + 0.020094*np.sin(2*g)
+           - 0.005686) * rad
+    obliq = (23.45229 - 0.0130125*t) * rad
 
-    # sun's right ascension in radians (0, 2*pi)
-    right_ascension = np.pi - np.arctan2(sind/(cosd * np.tan(obliq*rad)),
-                                         -np.cos(slp*rad)/cosd)
+    sin_slp = np.sin(slp)
+    cos_slp = np.cos(slp)
+
+    # sun's declination in radians
+    declination = np.arcsin(np.sin(obliq)*sin_slp)
+
+    # sun's right ascension in radians (-pi, pi]
+    right_ascension = np.arctan2(np.cos(obliq)*sin_slp, cos_slp)
 
     # Greenwich mean sidereal time in radians (0, 2*pi)
-    gmst = np.remainder(279.690983 + 0.9856473354*julian_date
-                        + 360.*frac_day + 180., 360.) * rad
+    gmst = 0.9856473354*julian_date
+    frac_day *= 360.
+    gmst += frac_day
+    gmst += 279.690983 + 180.
+    np.remainder(gmst, 360., out=gmst)
+    gmst *= rad
 
     theta = np.degrees(np.pi/2 - declination)  # convert to colatitude
     phi = center_azimuth(np.degrees(right_ascension - gmst))
@@ -905,6 +1101,98 @@ def sun_position(time):
     return theta, phi
 
 
+def _check_sun_time(time):
+    """
+    Check that the time (mjd2000) is within the validity of
+    :func:`sun_position`.
+
+    """
+    year = 2000  # reference year for mjd2000
+    years = time // 365.25  # computed once for both bounds
+
+    valid = ((year + years) < 2099) & ((year - years) > 1901)
+    if isinstance(valid, np.ndarray):
+        valid = valid.all()
+
+    assert valid, "Time must be between 1901 and 2099."
+
+
+def _sun_position_scalar(time):
+    """
+    Sun's position (colatitude and longitude in degrees) at a single time
+    (mjd2000) as in :func:`sun_position`, using the math module (fast for
+    scalars and supported by Numba).
+
+    """
+
+    rad = math.pi / 180
+
+    frac_day = time % 1.  # decimal fraction of a day
+    julian_date = 36524 + time + 0.5  # days since Jan 0, 1900, 12h00
+
+    t = julian_date/36525
+    v = (279.696678 + 0.9856473354*julian_date) % 360.
+    g = (358.475845 + 0.985600267*julian_date) % 360. * rad
+
+    # apparent longitude and obliquity of the ecliptic in radians
+    slp = (v + (1.91946 - 0.004789*t)*math.sin(g) + 0.020094*math.sin(2*g)
+           - 0.005686) * rad
+    obliq = (23.45229 - 0.0130125*t) * rad
+
+    sin_slp = math.sin(slp)
+
+    declination = math.asin(math.sin(obliq)*sin_slp)
+    right_ascension = math.atan2(math.cos(obliq)*sin_slp, math.cos(slp))
+
+    # Greenwich mean sidereal time in radians (0, 2*pi)
+    gmst = (279.690983 + 0.9856473354*julian_date
+            + 360.*frac_day + 180.) % 360. * rad
+
+    theta = (math.pi/2 - declination) / rad
+
+    # longitude centered around the prime meridian
+    phi = ((right_ascension - gmst) / rad) % 360.
+    if phi > 180.:
+        phi -= 360.
+
+    return theta, phi
+
+
+def _sun_position_kernel(time, theta, phi):
+    """
+    Elementwise :func:`sun_position`, compiled as generalized ufunc.
+
+    """
+    theta[0], phi[0] = _sun_position_scalar(time)
+
+
+def _zenith_angle_kernel(time, theta, phi, zeta):
+    """
+    Elementwise :func:`zenith_angle`, compiled as generalized ufunc.
+
+    """
+    rad = np.pi / 180
+
+    theta_sun, phi_sun = _sun_position_scalar(time)
+
+    cos_zeta = (np.cos(theta*rad)*np.cos(theta_sun*rad)
+                + np.sin(theta*rad)*np.sin(theta_sun*rad)
+                * np.cos((phi_sun - phi)*rad))
+
+    zeta[0] = np.arccos(cos_zeta) / rad
+
+
+if HAS_NUMBA:
+    _sun_position_scalar = numba.njit(cache=True, fastmath=True)(
+        _sun_position_scalar)
+    _sun_position_kernel = numba.guvectorize(
+        ['void(float64, float64[:], float64[:])'], '()->(),()',
+        target='parallel', cache=True, fastmath=True)(_sun_position_kernel)
+    _zenith_angle_kernel = numba.guvectorize(
+        ['void(float64, float64, float64, float64[:])'], '(),(),()->()',
+        target='parallel', cache=True, fastmath=True)(_zenith_angle_kernel)
+
+
 def zenith_angle(time, theta, phi):
     """
     Compute the solar zenith angle.
@@ -927,6 +1215,11 @@ def zenith_angle(time, theta, phi):
 
     """
 
+    if HAS_NUMBA:
+        # compiled elementwise evaluation without temporary arrays
+        _check_sun_time(time)
+        return _zenith_angle_kernel(time, theta, phi)
+
     theta_sun, phi_sun = sun_position(time)
 
     colat = np.radians(theta_sun)
@@ -960,15 +1253,52 @@ def spherical_to_cartesian(radius, theta, phi):
 
     """
 
-    theta, phi = np.radians(theta), np.radians(phi)
+    sin_theta, cos_theta = _sincos_deg(theta)
+    sin_phi, cos_phi = _sincos_deg(phi)
+
+    radius = np.asarray(radius)
+    rho = radius * sin_theta  # distance to the z-axis
 
-    x = np.array(radius) * np.cos(phi) * np.sin(theta)
-    y = np.array(radius) * np.sin(phi) * np.sin(theta)
-    z = np.array(radius) * np.cos(theta)
+    x = rho * cos_phi
+    y = rho * sin_phi
+    z = radius * cos_theta
 
     return x, y, z
 
 
+def _spherical_to_cartesian_stack(radius, theta, phi):
+    """
+    Cartesian coordinates as in :func:`spherical_to_cartesian` but written
+    into a single array with the components in the last dimension,
+    shape (..., 3).
+
+    """
+
+    sin_theta, cos_theta = _sincos_deg(theta)
+    sin_phi, cos_phi = _sincos_deg(phi)
+
+    radius = np.asarray(radius)
+    rho = radius * sin_theta  # distance to the z-axis
+
+    shape = np.broadcast(rho, cos_phi, cos_theta).shape
+
+    xyz = np.empty(shape + (3,))
+    np.multiply(rho, cos_phi, out=xyz[..., 0])
+    np.multiply(rho, sin_phi, out=xyz[..., 1])
+    np.multiply(radius, cos_theta, out=xyz[..., 2])
+
+    return xyz
+
+
+def _sincos_deg(angle):
+    """
+    Sine and cosine of angles given in degrees.
+
+    """
+    angle = np.radians(angle)
+    return np.sin(angle), np.cos(angle)
+
+
 def cartesian_to_spherical(x, y, z):
     """
     Convert cartesian coordinates to spherical coordinates.
@@ -987,8 +1317,10 @@ def cartesian_to_spherical(x, y, z):
         Longitude in degrees :math:`(-180^\\circ,180^\\circ]`.
     """
 
-    radius = np.sqrt(x**2 + y**2 + z**2)
-    theta = np.arctan2(np.sqrt(x**2 + y**2), z)
+    rho = np.hypot(x, y)  # distance to the z-axis
+
+    radius = np.hypot(rho, z)
+    theta = np.arctan2(rho, z)
     phi = np.arctan2(y, x)
 
     return radius, np.degrees(theta), np.degrees(phi)
@@ -1037,22 +1369,14 @@ def gg_to_geo(height, beta, X=None, Z=None):
 
     """
 
-    a = config_utils.basicConfig['params.ellipsoid'][0]  # equatorial radius
-    b = config_utils.basicConfig['params.ellipsoid'][1]  # polar radius
-
-    # convert geodetic colatitude to latitude
-    alpha = np.radians(90. - beta)
-
-    sin_alpha_2 = np.sin(alpha)**2
-    cos_alpha_2 = np.cos(alpha)**2
+    # equatorial and polar radius
+    a, b = config_utils.basicConfig['params.ellipsoid']
 
-    factor = height*np.sqrt(a**2*cos_alpha_2 + b**2*sin_alpha_2)
-    gamma = np.arctan2((factor + b**2)*np.tan(alpha), (factor + a**2))
-
-    theta = 90. - np.degrees(gamma)
-    radius = np.sqrt(height**2 + 2*factor +
-                     a**2*(1. - (1. - (b/a)**4)*sin_alpha_2) /
-                          (1. - (1. - (b/a)**2)*sin_alpha_2))
+    if HAS_NUMBA:
+        # compiled elementwise evaluation without temporary arrays
+        radius, theta = _gg_to_geo_kernel(height, beta, a, b)
+    else:
+        radius, theta = _gg_to_geo_core(height, beta, a, b)
 
     # transform vector components
     if (X is not None) and (Z is not None):
@@ -1119,8 +1443,62 @@ def geo_to_gg(radius, theta, B_radius=None, B_theta=None):
 
     """
 
-    a = config_utils.basicConfig['params.ellipsoid'][0]  # equatorial radius
-    b = config_utils.basicConfig['params.ellipsoid'][1]  # polar radius
+    # equatorial and polar radius
+    a, b = config_utils.basicConfig['params.ellipsoid']
+
+    if HAS_NUMBA:
+        # compiled elementwise evaluation without temporary arrays
+        height, beta = _geo_to_gg_kernel(radius, theta, a, b)
+    else:
+        height, beta = _geo_to_gg_core(radius, theta, a, b)
+
+    # transform vector components
+    if (B_radius is not None) and (B_theta is not None):
+
+        gg_1, _, gg_3 = basevectors_gg(theta, beta)
+
+        # components of base vectors are the row of the rotation matrix
+        X = gg_1[..., 0]*B_radius + gg_1[..., 1]*B_theta
+        Z = gg_3[..., 0]*B_radius + gg_3[..., 1]*B_theta
+
+        return height, beta, X, Z
+
+    else:
+        return height, beta
+
+
+def _gg_to_geo_core(height, beta, a, b):
+    """
+    Geocentric radius and colatitude from geodetic height and colatitude as in
+    :func:`gg_to_geo` given the equatorial and polar radius. Works on arrays
+    and, compiled with Numba, on scalars.
+
+    """
+
+    # convert geodetic colatitude to latitude
+    alpha = np.radians(90. - beta)
+
+    sin_alpha_2 = np.sin(alpha)**2
+    cos_alpha_2 = np.cos(alpha)**2
+
+    factor = height*np.sqrt(a**2*cos_alpha_2 + b**2*sin_alpha_2)
+    gamma = np.arctan2((factor + b**2)*np.tan(alpha), (factor + a**2))
+
+    theta = 90. - np.degrees(gamma)
+    radius = np.sqrt(height**2 + 2*factor +
+                     a**2*(1. - (1. - (b/a)**4)*sin_alpha_2) /
+                          (1. - (1. - (b/a)**2)*sin_alpha_2))
+
+    return radius, theta
+
+
+def _geo_to_gg_core(radius, theta, a, b):
+    """
+    Geodetic height and colatitude from geocentric radius and colatitude as in
+    :func:`geo_to_gg` given the equatorial and polar radius. Works on arrays
+    and, compiled with Numba, on scalars.
+
+    """
 
     a2 = a**2
     b2 = b**2
@@ -1160,19 +1538,37 @@ def geo_to_gg(radius, theta, B_radius=None, B_theta=None):
 
     beta = 90. - np.degrees(np.arctan2(z + ep2*z0, r))
 
-    # transform vector components
-    if (B_radius is not None) and (B_theta is not None):
+    return height, beta
 
-        gg_1, _, gg_3 = basevectors_gg(theta, beta)
 
-        # components of base vectors are the row of the rotation matrix
-        X = gg_1[..., 0]*B_radius + gg_1[..., 1]*B_theta
-        Z = gg_3[..., 0]*B_radius + gg_3[..., 1]*B_theta
+def _gg_to_geo_kernel(height, beta, a, b, radius, theta):
+    """
+    Elementwise :func:`_gg_to_geo_core`, compiled as generalized ufunc.
 
-        return height, beta, X, Z
+    """
+    radius[0], theta[0] = _gg_to_geo_core(height, beta, a, b)
 
-    else:
-        return height, beta
+
+def _geo_to_gg_kernel(radius, theta, a, b, height, beta):
+    """
+    Elementwise :func:`_geo_to_gg_core`, compiled as generalized ufunc.
+
+    """
+    height[0], beta[0] = _geo_to_gg_core(radius, theta, a, b)
+
+
+if HAS_NUMBA:
+    # no fastmath, since failures of the algorithm are signaled with NaN
+    _gg_to_geo_core = numba.njit(cache=True)(_gg_to_geo_core)
+    _geo_to_gg_core = numba.njit(cache=True)(_geo_to_gg_core)
+    _gg_to_geo_kernel = numba.guvectorize(
+        ['void(float64, float64, float64, float64, float64[:], float64[:])'],
+        '(),(),(),()->(),()', target='parallel', cache=True)(
+            _gg_to_geo_kernel)
+    _geo_to_gg_kernel = numba.guvectorize(
+        ['void(float64, float64, float64, float64, float64[:], float64[:])'],
+        '(),(),(),()->(),()', target='parallel', cache=True)(
+            _geo_to_gg_kernel)
 
 
 def basevectors_gg(theta, beta):
@@ -1193,25 +1589,26 @@ def basevectors_gg(theta, beta):
         GEO.
 
     """
-    psi = np.radians(theta - beta)  # difference angle
+    sin_psi, cos_psi = _sincos_deg(theta - beta)  # difference angle
 
     grid_shape = np.broadcast(theta, beta).shape
 
-    # predefine output, the components of the base vectors in the last
-    # dimensions: shape (..., 3, 3)
-    gg_1 = np.zeros(grid_shape + (3,))
-    gg_2 = np.zeros(grid_shape + (3,))
-    gg_3 = np.zeros(grid_shape + (3,))
+    # predefine output, the base vectors are views into a single buffer with
+    # the components in the last dimension: shape (..., 3, 3)
+    gg = np.empty(grid_shape + (3, 3))
 
-    gg_1[..., 0] = -np.sin(psi)
-    gg_1[..., 1] = -np.cos(psi)
+    gg[..., 0, 0] = -sin_psi
+    gg[..., 0, 1] = -cos_psi
+    gg[..., 0, 2] = 0.
 
-    gg_2[..., 2] = 1.
+    gg[..., 1, :2] = 0.
+    gg[..., 1, 2] = 1.
 
-    gg_3[..., 0] = -np.cos(psi)
-    gg_3[..., 1] = np.sin(psi)
+    gg[..., 2, 0] = -cos_psi
+    gg[..., 2, 1] = sin_psi
+    gg[..., 2, 2] = 0.
 
-    return gg_1, gg_2, gg_3
+    return gg[..., 0, :], gg[..., 1, :], gg[..., 2, :]
 
 
 def basevectors_gsm(time, dipole=None):
@@ -1239,32 +1636,36 @@ def basevectors_gsm(time, dipole=None):
 
     """
 
+    R = _rotation_gsm(time, dipole)
+
+    return R[..., 0, :], R[..., 1, :], R[..., 2, :]
+
+
+def _rotation_gsm(time, dipole=None):
+    """
+    Rotation matrices from GEO to GSM, shape (..., 3, 3), with the unit base
+    vectors of GSM as rows (see :func:`basevectors_gsm`).
+
+    """
+
     vec = dipole_to_vec(dipole)
 
-    # get sun's position at specified times
-    theta_sun, phi_sun = sun_position(time)
+    # compute sun's position, the first unit vector resides in last dimension
+    sun = _sun_xyz(time)
 
-    # compute sun's position
-    x_sun, y_sun, z_sun = spherical_to_cartesian(1, theta_sun, phi_sun)
+    R = np.empty(np.broadcast_shapes(vec.shape, sun.shape)[:-1] + (3, 3))
 
-    # create array in which the first unit vector resides in last dimension
-    gsm_1 = np.empty(x_sun.shape + (3,))
-    gsm_1[..., 0] = x_sun
-    gsm_1[..., 1] = y_sun
-    gsm_1[..., 2] = z_sun
+    R[..., 0, :] = sun
 
     # compute second base vector of GSM using the cross product of the
     # dipole unit vector with the first unit base vector
-
-    gsm_2 = np.cross(vec, gsm_1)  # over last dimension by default
-    norm_gsm_2 = np.linalg.norm(gsm_2, axis=-1, keepdims=True)
-    gsm_2 = gsm_2 / norm_gsm_2
+    R[..., 1, :] = _normalize(_cross(vec, sun))
 
     # compute third unit base vector using the cross product of first and
     # second unit base vector
-    gsm_3 = np.cross(gsm_1, gsm_2)
+    R[..., 2, :] = _cross(R[..., 0, :], R[..., 1, :])
 
-    return gsm_1, gsm_2, gsm_3
+    return R
 
 
 def basevectors_sm(time, dipole=None):
@@ -1292,35 +1693,69 @@ def basevectors_sm(time, dipole=None):
 
     """
 
+    R = _rotation_sm(time, dipole)
+
+    return R[..., 0, :], R[..., 1, :], R[..., 2, :]
+
+
+def _rotation_sm(time, dipole=None):
+    """
+    Rotation matrices from GEO to SM, shape (..., 3, 3), with the unit base
+    vectors of SM as rows (see :func:`basevectors_sm`).
+
+    """
+
     vec = dipole_to_vec(dipole)
 
     # get sun's position at specified times and convert to cartesian
-    theta_sun, phi_sun = sun_position(time)
-    x_sun, y_sun, z_sun = spherical_to_cartesian(1, theta_sun, phi_sun)
+    # the sun's vector resides in last dimension
+    s = _sun_xyz(time)
 
-    # create array in which the sun's vector resides in last dimension
-    s = np.empty(x_sun.shape + (3,))
-    s[..., 0] = x_sun
-    s[..., 1] = y_sun
-    s[..., 2] = z_sun
+    R = np.empty(np.broadcast_shapes(vec.shape, s.shape)[:-1] + (3, 3))
 
     # set third unit base vector of SM to dipole unit vector
-    sm_3 = np.empty(x_sun.shape + (3,))
-    sm_3[..., 0] = vec[..., 0]
-    sm_3[..., 1] = vec[..., 1]
-    sm_3[..., 2] = vec[..., 2]
+    R[..., 2, :] = vec
 
     # compute second base vector of SM using the cross product of the IGRF
     # dipole unit vector and the sun direction vector
-    sm_2 = np.cross(sm_3, s)
-    norm_sm_2 = np.linalg.norm(sm_2, axis=-1, keepdims=True)
-    sm_2 = sm_2 / norm_sm_2
+    R[..., 1, :] = _normalize(_cross(R[..., 2, :], s))
 
     # compute third unit base vector using the cross product of second and
     # third unit base vector
-    sm_1 = np.cross(sm_2, sm_3)
+    R[..., 0, :] = _cross(R[..., 1, :], R[..., 2, :])
+
+    return R
+
 
-    return sm_1, sm_2, sm_3
+def _sun_xyz(time):
+    """
+    Cartesian unit vector pointing to the sun, shape (..., 3), at the given
+    times (mjd2000).
+
+    The vector at scalar times is cached, since GSM and SM are often
+    evaluated repeatedly at the same epoch.
+
+    """
+    if np.ndim(time) == 0:
+        return _sun_xyz_cached(float(time)).copy()
+
+    theta_sun, phi_sun = sun_position(time)
+
+    return _spherical_to_cartesian_stack(1., theta_sun, phi_sun)
+
+
+@lru_cache(maxsize=128)
+def _sun_xyz_cached(time):
+    """
+    Cached :func:`_sun_xyz` at a scalar time (read-only result).
+
+    """
+    theta_sun, phi_sun = sun_position(time)
+
+    vec = _spherical_to_cartesian_stack(1., theta_sun, phi_sun)
+    vec.setflags(write=False)
+
+    return vec
 
 
 def basevectors_mag(dipole=None):
@@ -1347,12 +1782,42 @@ def basevectors_mag(dipole=None):
     """
 
     mag_3 = dipole_to_vec(dipole)
-    mag_2 = np.cross(np.array([0., 0., 1.]), mag_3)
-    mag_2 = mag_2 / np.linalg.norm(mag_2, axis=-1, keepdims=True)
+    x, y, z = mag_3[..., 0], mag_3[..., 1], mag_3[..., 2]
 
-    mag_1 = np.cross(mag_2, mag_3)
+    # distance of the unit vector to the rotation axis
+    rho = np.sqrt(x*x + y*y)
+
+    # closed form of the normalized cross product of the rotation axis
+    # [0, 0, 1] with mag_3, and of the cross product of mag_2 with mag_3
+    mag_2 = np.stack((-y/rho, x/rho, np.zeros_like(rho)), axis=-1)
+    mag_1 = np.stack((x*z/rho, y*z/rho, -rho), axis=-1)
+
+    # dipole_to_vec may return a shared read-only array
+    return mag_1, mag_2, mag_3.copy()
+
+
+def _cross(a, b):
+    """
+    Cross product of vectors in the last dimension, written out in components
+    (much less overhead than :func:`numpy.cross` for vectors of length 3).
+
+    """
+    a_1, a_2, a_3 = a[..., 0], a[..., 1], a[..., 2]
+    b_1, b_2, b_3 = b[..., 0], b[..., 1], b[..., 2]
+
+    return np.stack((a_2*b_3 - a_3*b_2,
+                     a_3*b_1 - a_1*b_3,
+                     a_1*b_2 - a_2*b_1), axis=-1)
+
+
+def _normalize(vec):
+    """
+    Scale vectors in the last dimension to unit length.
+
+    """
+    x, y, z = vec[..., 0], vec[..., 1], vec[..., 2]
 
-    return mag_1, mag_2, mag_3
+    return vec / np.sqrt(x*x + y*y + z*z)[..., None]
 
 
 def basevectors_use(theta, phi):
@@ -1374,13 +1839,26 @@ def basevectors_use(theta, phi):
 
     """
 
-    theta = np.array(np.radians(theta))
-    phi = np.array(np.radians(phi))
+    # np.radians already returns new arrays, no need for another copy
+    theta = np.radians(theta)
+    phi = np.radians(phi)
 
+    # check the colatitude itself, since in floating point sin(pi) != 0
     if (np.amin(theta) == 0.) or (np.amax(theta) == np.pi):
         raise ValueError("Basevectors are not defined at poles.")
 
-    grid_shape = np.broadcast(theta, phi).shape
+    return _basevectors_use_trig(np.sin(theta), np.cos(theta),
+                                 np.sin(phi), np.cos(phi))
+
+
+def _basevectors_use_trig(sin_theta, cos_theta, sin_phi, cos_phi):
+    """
+    Unit base vectors of the local USE frame as in :func:`basevectors_use`
+    but given the sine and cosine of colatitude and longitude.
+
+    """
+
+    grid_shape = np.broadcast(sin_theta, sin_phi).shape
 
     # predefine output, the components of the base vectors in the last
     # dimensions: shape (..., 3, 3)
@@ -1388,12 +1866,6 @@ def basevectors_use(theta, phi):
     use_2 = np.empty(grid_shape + (3,))
     use_3 = np.empty(grid_shape + (3,))
 
-    # calculate and save sin/cos of angles
-    sin_phi = np.sin(phi)
-    sin_theta = np.sin(theta)
-    cos_phi = np.cos(phi)
-    cos_theta = np.cos(theta)
-
     # first base vector (Up)
     use_1[..., 0] = sin_theta*cos_phi
     use_1[..., 1] = sin_theta*sin_phi
@@ -1449,6 +1921,33 @@ def geo_to_base(theta, phi, base_1, base_2, base_3, inverse=None):
     # convert spherical to cartesian (radius = 1) coordinates
     x, y, z = spherical_to_cartesian(1, theta, phi)
 
+    x_ref, y_ref, z_ref = _rotate_cartesian(x, y, z, base_1, base_2, base_3,
+                                            inverse=inverse)
+
+    # convert to spherical coordinates, discard radius as it is 1.
+    _, theta_ref, phi_ref = cartesian_to_spherical(x_ref, y_ref, z_ref)
+
+    return theta_ref, phi_ref
+
+
+def _rotate_cartesian(x, y, z, base_1, base_2, base_3, inverse=False):
+    """
+    Cartesian components in the reference system given by the base vectors
+    (or in GEO if ``inverse=True``).
+
+    """
+
+    if base_1.ndim == base_2.ndim == base_3.ndim == 1:
+        # same base vectors for all points: single (3, 3) @ (3, N) product
+        matrix = np.stack((base_1, base_2, base_3))  # base vectors as rows
+        if inverse:
+            matrix = matrix.T
+
+        xyz = np.stack(np.broadcast_arrays(x, y, z))
+        xyz_ref = np.matmul(matrix, xyz.reshape(3, -1)).reshape(xyz.shape)
+
+        return xyz_ref[0], xyz_ref[1], xyz_ref[2]
+
     if inverse:
         # components of unit base vectors are the columns of inverse matrix
         x_ref = base_1[..., 0]*x + base_2[..., 0]*y + base_3[..., 0]*z
@@ -1461,10 +1960,7 @@ def geo_to_base(theta, phi, base_1, base_2, base_3, inverse=None):
         y_ref = base_2[..., 0]*x + base_2[..., 1]*y + base_2[..., 2]*z
         z_ref = base_3[..., 0]*x + base_3[..., 1]*y + base_3[..., 2]*z
 
-    # convert to spherical coordinates, discard radius as it is 1.
-    _, theta_ref, phi_ref = cartesian_to_spherical(x_ref, y_ref, z_ref)
-
-    return theta_ref, phi_ref
+    return x_ref, y_ref, z_ref
 
 
 def transform_points(theta, phi, time=None, *, reference=None, inverse=None,
@@ -1581,24 +2077,60 @@ def matrix_geo_to_base(theta, phi, base_1, base_2, base_3, inverse=None):
 
     inverse = False if inverse is None else inverse
 
+    # rotate vector according to reference system defined by base vectors
+    R_geo_to_ref = np.stack((base_1, base_2, base_3), axis=-2)
+
+    return _matrix_geo_to_base(theta, phi, R_geo_to_ref, inverse=inverse)
+
+
+def _matrix_geo_to_base(theta, phi, R_geo_to_ref, inverse=False):
+    """
+    Same as :func:`matrix_geo_to_base` but given the rotation matrices from
+    GEO to the reference system, shape (..., 3, 3), with the base vectors as
+    rows.
+
+    """
+
+    if (np.amin(theta) == 0.) or (np.amax(theta) == 180.):
+        raise ValueError("Basevectors are not defined at poles.")
+
+    # sine and cosine of the input coordinates, computed only once
+    sin_theta, cos_theta = _sincos_deg(theta)
+    sin_phi, cos_phi = _sincos_deg(phi)
+    trig_in = (sin_theta, cos_theta, sin_phi, cos_phi)
+
+    # rotate cartesian coordinates (radius = 1) of the input points
+    x, y, z = _rotate_cartesian(cos_phi*sin_theta, sin_phi*sin_theta,
+                                cos_theta, R_geo_to_ref[..., 0, :],
+                                R_geo_to_ref[..., 1, :],
+                                R_geo_to_ref[..., 2, :], inverse=inverse)
+
+    # sine and cosine of the output coordinates follow from the cartesian
+    # components, since the radius is 1
+    rho = np.hypot(x, y)
+    trig_out = (rho, z, y/rho, x/rho)
+
+    theta_out = np.degrees(np.arctan2(rho, z))
+    phi_out = np.degrees(np.arctan2(y, x))
+
+    if np.amin(rho) == 0.:
+        raise ValueError("Basevectors are not defined at poles.")
+
     if inverse:
-        theta_ref, phi_ref = theta, phi
-        theta, phi = geo_to_base(theta_ref, phi_ref, base_1, base_2,
-                                 base_3, inverse=True)
+        theta_ref, phi_ref, trig_ref = theta, phi, trig_in
+        theta, phi, trig = theta_out, phi_out, trig_out
     else:
-        theta_ref, phi_ref = geo_to_base(theta, phi, base_1, base_2, base_3)
+        theta_ref, phi_ref, trig_ref = theta_out, phi_out, trig_out
+        trig = trig_in
 
     # matrix to rotate vector from USE at (theta, phi) to GEO
-    R_use_to_geo = np.stack(basevectors_use(theta, phi), axis=-1)
-
-    # rotate vector according to reference system defined by base vectors
-    R_geo_to_ref = np.stack((base_1, base_2, base_3), axis=-2)
+    R_use_to_geo = np.stack(_basevectors_use_trig(*trig), axis=-1)
 
     # matrix to rotate vector from original USE to reference system
     R_use_to_ref = np.matmul(R_geo_to_ref, R_use_to_geo)
 
     # matrix to rotate reference to new USE using the transpose
-    R_ref_to_use2 = np.stack(basevectors_use(theta_ref, phi_ref), axis=-2)
+    R_ref_to_use2 = np.stack(_basevectors_use_trig(*trig_ref), axis=-2)
 
     # complete rotation matrix: spherical GEO to spherical reference
     R = np.matmul(R_ref_to_use2, R_use_to_ref)  # == R_use_to_use2
@@ -1671,24 +2203,24 @@ def transform_vectors(theta, phi, B_theta, B_phi, time=None, reference=None,
         dipole = config_utils.basicConfig['params.dipole']
 
     if reference == 'gsm':
-        # compute GSM base vectors
-        base_1, base_2, base_3 = basevectors_gsm(time, dipole=dipole)
+        # compute GSM base vectors as rows of the rotation matrix
+        R_geo_to_ref = _rotation_gsm(time, dipole=dipole)
 
     elif reference == 'sm':
-        # compute SM base vectors
-        base_1, base_2, base_3 = basevectors_sm(time, dipole=dipole)
+        # compute SM base vectors as rows of the rotation matrix
+        R_geo_to_ref = _rotation_sm(time, dipole=dipole)
 
     elif reference == 'mag':
         # compute centered dipole base vectors
-        base_1, base_2, base_3 = basevectors_mag(dipole=dipole)
+        R_geo_to_ref = np.stack(basevectors_mag(dipole=dipole), axis=-2)
 
     else:
         raise ValueError('Unknown target reference system. Use one of '
                          '{"gsm", "sm", "mag"}.')
 
     # combine basevectors
-    theta_ref, phi_ref, R = matrix_geo_to_base(
-        theta, phi, base_1, base_2, base_3, inverse=inverse)
+    theta_ref, phi_ref, R = _matrix_geo_to_base(
+        theta, phi, R_geo_to_ref, inverse=inverse)
 
     # transform vector components
     B_theta_ref = R[..., 1, 1]*B_theta + R[..., 1, 2]*B_phi
@@ -1697,24 +2229,44 @@ def transform_vectors(theta, phi, B_theta, B_phi, time=None, reference=None,
     return theta_ref, phi_ref, B_theta_ref, B_phi_ref
 
 
-def _qdipole_nonvectorized(year, glat, glon, height, apex):
-    """Helper that calls fortranapex to compute quasi-dipole coordinates."""
+def _qdipole(year, glat, glon, height, apex):
+    """
+    Helper that calls fortranapex to compute quasi-dipole coordinates and
+    base vectors for all points (broadcast inputs).
+
+    The points are processed in order of the decimal year, so that the epoch
+    of ``apex`` is only set once for each distinct year.
+
+    """
+
+    shape = np.broadcast(year, glat, glon, height).shape
+
+    year, glat, glon, height = (np.ravel(a) for a in np.broadcast_arrays(
+        year, glat, glon, height))
+
+    # longitude on the interval [-180, 180) for all points at once
+    glon = (glon + 180) % 360 - 180
 
-    apex.set_epoch(year)
-    qdlat, qdlon = apexpy.fortranapex.apxg2q(
-        glat, (glon + 180) % 360 - 180, height, 0)[:2]
-    f1, f2 = apexpy.fortranapex.apxg2q(
-        glat, (glon + 180) % 360 - 180, height, 1)[2:4]
+    # predefine output arrays
+    qdlat = np.empty(year.size)
+    qdlon = np.empty(year.size)
+    f1 = np.empty((year.size, 2))
+    f2 = np.empty((year.size, 2))
+
+    epoch = None
+    for index in np.argsort(year, kind='stable'):
 
-    return qdlat, qdlon, f1, f2
+        if year[index] != epoch:
+            epoch = year[index]
+            apex.set_epoch(epoch)
 
+        # coordinates and base vectors in a single call
+        qdlat[index], qdlon[index], f1[index], f2[index] = \
+            apexpy.fortranapex.apxg2q(
+                glat[index], glon[index], height[index], 1)[:4]
 
-# create numpy vectorized function
-_qdipole = np.vectorize(
-    _qdipole_nonvectorized,
-    signature='(),(),(),()->(),(),(n),(n)',
-    excluded={4, 'apex'}
-)
+    return (qdlat.reshape(shape), qdlon.reshape(shape),
+            f1.reshape(shape + (2,)), f2.reshape(shape + (2,)))
 
 
 def qdipole(time, radius, theta, phi, datafile=None, fortranlib=None):
@@ -1821,11 +2373,9 @@ def center_azimuth(phi):
 
     """
 
-    phi = phi % 360.
-    try:  # works for ndarray
-        phi = np.where(phi > 180., phi - 360., phi)  # centered around prime
-    except TypeError:  # catch error if float
-        phi += -360. if phi > 180. else 0.
+    # same path for floats and ndarrays
+    phi = np.mod(phi, 360.)
+    phi -= 360.*(phi > 180.)  # centered around prime, in place for ndarray
 
     return phi
 
@@ -1849,7 +2399,344 @@ def local_time(time, phi):
 
     """
 
-    return np.remainder(time + phi/360, 1)*24
+    # reduce and scale in place (rebinds for scalars)
+    local = np.add(time, np.divide(phi, 360))
+    local %= 1
+    local *= 24
+
+    return local
+
+
+def _c_response_constant(periods, sigma, radius, n):
+    """
+    C-response (km) of a sphere with layers of constant conductivity as in
+    :func:`q_response_1D` with ``kind='constant'``, evaluated for all periods
+    at once.
+
+    """
+
+    fac1 = factorial(n)
+    fac2 = (-1)**n * fac1/(2*n+1)
+
+    if HAS_NUMBA:
+        # compiled loop over the periods without temporary arrays
+        C = _c_response_constant_loop(np.ravel(periods), sigma, radius, n,
+                                      float(fac1), fac2)
+        return C.reshape(periods.shape)
+
+    nl = radius.size-2  # index of last layer, there are nl+1 layers
+
+    eps = 1.0e-10
+    zlimit = 3
+
+    sign_pi2 = (-1)**(n+1) * np.pi/2
+
+    # initialze ratios of the spherical bessel functions for all periods
+    v1 = np.empty(periods.shape, dtype=complex)
+    v2 = np.empty(periods.shape, dtype=complex)
+    v3 = np.empty(periods.shape, dtype=complex)
+    v4 = np.empty(periods.shape, dtype=complex)
+    v5 = np.empty(periods.shape, dtype=complex)
+    v6 = np.empty(periods.shape, dtype=complex)
+
+    for il in range(nl, -1, -1):  # runs over nl...0
+        k = np.sqrt(8.0e-7 * 1.0j * np.pi**2 * sigma[il] / periods)
+        z = (k*radius[il]*1000, k*radius[il+1]*1000)
+
+        small = np.abs(z[0]) < zlimit
+        large = ~small
+
+        if np.any(small):
+            # calculate spherical bessel functions with small argument
+            # by power series (abramowitz & Stegun 10.2.5, 10.2.6
+            # and 10.2.4):
+            # both interfaces of the layer in one array, shape (2, ...)
+            zm = np.stack((z[0][small], z[1][small]))
+
+            p = np.ones(zm.shape, dtype=complex)
+            q = np.ones(zm.shape, dtype=complex)
+            pd = np.full(zm.shape, n, dtype=complex)
+            qd = np.full(zm.shape, -(n+1), dtype=complex)
+            zz = zm**2 / 2
+
+            j = 1
+            dp = np.ones(zm.shape, dtype=complex)
+            dq = np.ones(zm.shape, dtype=complex)
+            active = np.ones(zm.shape, dtype=bool)
+            while np.any(active):
+                # freeze converged terms, so that each series stops at the
+                # same term as if evaluated on its own
+                dp = np.where(active, dp * zz / j / (2*j+1+2*n), 0.)
+                dq = np.where(active, dq * zz / j / (2*j-1-2*n), 0.)
+                p = p + dp
+                q = q + dq
+                pd = pd + dp*(2*j+n)
+                qd = qd + dq*(2*j-n-1)
+                active = (np.abs(dp) > eps) | (np.abs(dq) > eps)
+                j += 1
+
+            # integer powers of the argument from a single complex power
+            zm_n = zm**n
+            zm_inv = 1 / zm
+            zm_m = zm_inv / zm_n  # zm**(-n-1)
+
+            p = p * zm_n / fac1
+            q = q * zm_m * fac2
+            q = sign_pi2 * (p-q)
+            pd = pd * (zm_n*zm_inv) / fac1
+            qd = qd * (zm_m*zm_inv) * fac2
+            qd = sign_pi2 * (pd-qd)
+
+            v1[small] = p[1] / p[0]
+            v2[small] = pd[0] / p[0]
+            v3[small] = pd[1] / p[0]
+            v4[small] = q[0] / q[1]
+            v5[small] = qd[0] / q[1]
+            v6[small] = qd[1] / q[1]
+
+        if np.any(large):
+            # calculate spherical bessel functions with large argument
+            # the exponential behaviour is split off and treated
+            # separately (abramowitz & stegun 10.2.9 and 10.2.15)
+            # both interfaces of the layer in one array, shape (2, ...)
+            zm = np.stack((z[0][large], z[1][large]))
+
+            zz = 2*zm
+            rm = 1+0j
+            rp = 1+0j
+            rmd = 1+0j
+            rpd = 1+0j
+            d = 1+0j
+            sg = 1+0j
+            for j in range(1, n+1):
+                d = d * (n+1-j)*(n+j) / j / zz
+                sg = -sg
+                rp = rp + d
+                rm = rm + sg*d
+                rmd = rmd + sg*d*(j+1)
+                rpd = rpd + d*(j+1)
+
+            e = np.exp(-2*zm)
+            p = (rm - sg*rp*e) / zz
+            q = (np.pi/zz) * rp
+            pd = (rm + sg*rp*e) / zz - 2*(rmd - sg*rpd*e) / zz**2
+            qd = -q - 2*np.pi*rpd / zz**2
+
+            e = np.exp(-(z[0][large] - z[1][large]))
+            v1[large] = p[1] / p[0] * e
+            v2[large] = pd[0] / p[0]
+            v3[large] = pd[1] / p[0] * e
+            v4[large] = q[0] / q[1] * e
+            v5[large] = qd[0] / q[1] * e
+            v6[large] = qd[1] / q[1]
+
+        if (il == nl):
+            b = k*(v2 - v5*v1) / (1 - v4*v1)
+        else:
+            b = (k*((v2 - v5*v1)*b + k*(v5*v3-v2*v6)) /
+                 ((1 - v4*v1)*b + k*(v4*v3 - v6)))
+
+    return radius[0] / (1+1000*radius[0]*b)  # C in km
+
+
+def _c_response_constant_loop(periods, sigma, radius, n, fac1, fac2):
+    """
+    Same as :func:`_c_response_constant` for a vector of periods but with
+    explicit loops over complex scalars (compiled with Numba, parallel over
+    the periods).
+
+    """
+
+    nl = radius.size-2  # index of last layer, there are nl+1 layers
+
+    zlimit = 3
+
+    C = np.empty(periods.size, dtype=np.complex128)
+
+    # periods are independent, each writes a single entry of the output
+    for counter in numba.prange(periods.size):
+        b = 0j
+        for il in range(nl, -1, -1):  # runs over nl...0
+            k = cmath.sqrt(8.0e-7 * 1.0j * math.pi**2 * sigma[il]
+                           / periods[counter])
+            z0 = k*radius[il]*1000
+            z1 = k*radius[il+1]*1000
+
+            if abs(z0) < zlimit:
+                p0, q0, pd0, qd0 = _bessel_small_arg(z0, n, fac1, fac2)
+                p1, q1, pd1, qd1 = _bessel_small_arg(z1, n, fac1, fac2)
+
+                v1 = p1 / p0
+                v2 = pd0 / p0
+                v3 = pd1 / p0
+                v4 = q0 / q1
+                v5 = qd0 / q1
+                v6 = qd1 / q1
+            else:
+                p0, q0, pd0, qd0 = _bessel_large_arg(z0, n)
+                p1, q1, pd1, qd1 = _bessel_large_arg(z1, n)
+
+                e = cmath.exp(-(z0 - z1))
+                v1 = p1 / p0 * e
+                v2 = pd0 / p0
+                v3 = pd1 / p0 * e
+                v4 = q0 / q1 * e
+                v5 = qd0 / q1 * e
+                v6 = qd1 / q1
+
+            if (il == nl):
+                b = k*(v2 - v5*v1) / (1 - v4*v1)
+            else:
+                b = (k*((v2 - v5*v1)*b + k*(v5*v3-v2*v6)) /
+                     ((1 - v4*v1)*b + k*(v4*v3 - v6)))
+
+        C[counter] = radius[0] / (1+1000*radius[0]*b)  # C in km
+
+    return C
+
+
+def _bessel_small_arg(z, n, fac1, fac2):
+    """
+    Spherical bessel functions and derivatives with small argument by power
+    series (abramowitz & Stegun 10.2.5, 10.2.6 and 10.2.4).
+
+    """
+
+    eps = 1.0e-10
+
+    p = 1+0j
+    q = 1+0j
+    pd = n + 0j
+    qd = -(n+1) + 0j
+    zz = z**2 / 2
+
+    j = 1
+    dp = 1+0j
+    dq = 1+0j
+    while (abs(dp) > eps or abs(dq) > eps):
+        dp = dp * zz / j / (2*j+1+2*n)
+        dq = dq * zz / j / (2*j-1-2*n)
+        p = p + dp
+        q = q + dq
+        pd = pd + dp*(2*j+n)
+        qd = qd + dq*(2*j-n-1)
+        j += 1
+
+    p = p * z**n / fac1
+    q = q * z**(-n-1) * fac2
+    q = (-1)**(n+1) * math.pi/2 * (p-q)
+    pd = pd * z**(n-1) / fac1
+    qd = qd * z**(-n-2) * fac2
+    qd = (-1)**(n+1) * math.pi/2 * (pd-qd)
+
+    return p, q, pd, qd
+
+
+def _bessel_large_arg(z, n):
+    """
+    Spherical bessel functions and derivatives with large argument, the
+    exponential behaviour is split off and treated separately
+    (abramowitz & stegun 10.2.9 and 10.2.15).
+
+    """
+
+    zz = 2*z
+    rm = 1+0j
+    rp = 1+0j
+    rmd = 1+0j
+    rpd = 1+0j
+    d = 1+0j
+    sg = 1.
+    for j in range(1, n+1):
+        d = d * (n+1-j)*(n+j) / j / zz
+        sg = -sg
+        rp = rp + d
+        rm = rm + sg*d
+        rmd = rmd + sg*d*(j+1)
+        rpd = rpd + d*(j+1)
+
+    e = cmath.exp(-2*z)
+    p = (rm - sg*rp*e) / zz
+    q = (math.pi/zz) * rp
+    pd = (rm + sg*rp*e) / zz - 2*(rmd - sg*rpd*e) / zz**2
+    qd = -q - 2*math.pi*rpd / zz**2
+
+    return p, q, pd, qd
+
+
+if HAS_NUMBA:
+    _bessel_small_arg = numba.njit(cache=True)(_bessel_small_arg)
+    _bessel_large_arg = numba.njit(cache=True)(_bessel_large_arg)
+    _c_response_constant_loop = numba.njit(parallel=True, cache=True)(
+        _c_response_constant_loop)
+
+
+def _c_response_quadratic(periods, sigma, radius, n):
+    """
+    C-response (km) of a sphere with layers of inverse quadratic conductivity
+    as in :func:`q_response_1D` with ``kind='quadratic'``.
+
+    The degree ``n`` may also be an array that broadcasts against
+    ``periods``, e.g. of shape (nmax, 1), to compute several degrees at once.
+
+    """
+
+    radius = 1e3*radius  # radius in meters
+
+    # constants
+    mu = 4*np.pi*1e-7
+
+    omega = 2*np.pi*1.0j/periods
+
+    # Number of layers
+    N = sigma.size
+
+    # layer independent factors
+    omega_mu = -omega*mu
+    n2 = (n+0.5)**2
+    sigma_radius = sigma*radius
+
+    # values for inner sphere, r = N (core)
+    qk = omega_mu*radius[-1]
+    bk = np.sqrt(n2 - qk*sigma_radius[-1])
+    bkp = bk + 0.5
+    Y = -bkp/qk  # admittance of the layer below
+
+    # Loop over all layers above core (from core to surface)
+    # from before last (N-2) to first (0)
+    for k in range(N-2, -1, -1):
+        # qk of the layer below is reused
+        qk1 = qk
+
+        # Compute temporary scalars
+        qk = omega_mu*radius[k]
+        bk = np.sqrt(n2 - qk*sigma_radius[k])
+        bkp = bk + 0.5
+        bkm = bk - 0.5
+
+        # (1 - etak**(2*bk)) / (1 + etak**(2*bk)) written as hyperbolic
+        # tangent, which does not overflow at high frequencies
+        tauk = -np.tanh(bk*np.log(radius[k]/radius[k+1]))
+
+        qY = qk1*Y
+
+        # Admittance for this layer
+        Y = 1/qk*(qY*(bk-0.5*tauk)+bkp*bkm*tauk)/(bk+tauk*(0.5+qY))
+
+    # Compute the C-response (in km)
+    return 1/(omega*mu*Y)/1e3
+
+
+def _q_from_c(C, n, radius):
+    """
+    Q-response from the C-response (km) of degree ``n`` at the conductor
+    surface ``radius`` (km).
+
+    """
+
+    C_scaled = C / radius  # computed only once
+
+    return n/(n+1) * (1 - (n+1)*C_scaled) / (1 + n*C_scaled)
 
 
 def q_response_1D(periods, sigma, radius, n, kind=None):
@@ -1938,176 +2825,30 @@ def q_response_1D(periods, sigma, radius, n, kind=None):
     if sigma.ndim > 1:
         raise ValueError("Conductivity ``sigma`` must be a vector.")
 
-    if kind == 'constant':
-
-        nl = radius.size-2  # index of last layer, there are nl+1 layers
-
-        eps = 1.0e-10
-        zlimit = 3
-
-        fac1 = factorial(n)
-        fac2 = (-1)**n * fac1/(2*n+1)
-
-        # initialze helpers variables and output
-        C = np.empty(periods.shape, dtype=complex)
-        z = np.empty((2,), dtype=complex)
-        p = np.empty((2,), dtype=complex)
-        q = np.empty((2,), dtype=complex)
-        pd = np.empty((2,), dtype=complex)
-        qd = np.empty((2,), dtype=complex)
-
-        for counter, period in enumerate(periods):
-            for il in range(nl, -1, -1):  # runs over nl...0
-                k = np.sqrt(8.0e-7 * 1.0j * np.pi**2 * sigma[il] / period)
-                z[0] = k*radius[il]*1000
-                z[1] = k*radius[il+1]*1000
-
-                # calculate spherical bessel functions with small argument
-                # by power series (abramowitz & Stegun 10.2.5, 10.2.6
-                # and 10.2.4):
-
-                if abs(z[0]) < zlimit:
-                    for m in range(2):
-                        p[m] = 1+0j
-                        q[m] = 1+0j
-                        pd[m] = n
-                        qd[m] = -(n+1)
-                        zz = z[m]**2 / 2
-
-                        j = 1
-                        dp = 1+0j
-                        dq = 1+0j
-                        while (abs(dp) > eps or abs(dq) > eps):
-                            dp = dp * zz / j / (2*j+1+2*n)
-                            dq = dq * zz / j / (2*j-1-2*n)
-                            p[m] = p[m] + dp
-                            q[m] = q[m] + dq
-                            pd[m] = pd[m] + dp*(2*j+n)
-                            qd[m] = qd[m] + dq*(2*j-n-1)
-                            j += 1
-
-                        p[m] = p[m] * z[m]**n / fac1
-                        q[m] = q[m] * z[m]**(-n-1) * fac2
-                        q[m] = (-1)**(n+1) * np.pi/2 * (p[m]-q[m])
-                        pd[m] = pd[m] * z[m]**(n-1) / fac1
-                        qd[m] = qd[m] * z[m]**(-n-2) * fac2
-                        qd[m] = (-1)**(n+1) * np.pi/2 * (pd[m]-qd[m])
-
-                    v1 = p[1] / p[0]
-                    v2 = pd[0] / p[0]
-                    v3 = pd[1] / p[0]
-                    v4 = q[0] / q[1]
-                    v5 = qd[0] / q[1]
-                    v6 = qd[1] / q[1]
-                else:
-                    # calculate spherical bessel functions with large argument
-                    # the exponential behaviour is split off and treated
-                    # separately (abramowitz & stegun 10.2.9 and 10.2.15)
-                    for m in range(2):
-                        zz = 2*z[m]
-                        rm = 1+0j
-                        rp = 1+0j
-                        rmd = 1+0j
-                        rpd = 1+0j
-                        d = 1+0j
-                        sg = 1+0j
-                        for j in range(1, n+1):
-                            d = d * (n+1-j)*(n+j) / j / zz
-                            sg = -sg
-                            rp = rp + d
-                            rm = rm + sg*d
-                            rmd = rmd + sg*d*(j+1)
-                            rpd = rpd + d*(j+1)
-
-                        e = np.exp(-2*z[m])
-                        p[m] = (rm - sg*rp*e) / zz
-                        q[m] = (np.pi/zz) * rp
-                        pd[m] = ((rm + sg*rp*e) /
-                                 zz - 2*(rmd - sg*rpd*e) / zz**2)
-                        qd[m] = -q[m] - 2*np.pi*rpd / zz**2
-
-                    e = np.exp(-(z[0] - z[1]))
-                    v1 = p[1] / p[0] * e
-                    v2 = pd[0] / p[0]
-                    v3 = pd[1] / p[0] * e
-                    v4 = q[0] / q[1] * e
-                    v5 = qd[0] / q[1] * e
-                    v6 = qd[1] / q[1]
-
-                if (il == nl):
-                    b = k*(v2 - v5*v1) / (1 - v4*v1)
-                else:
-                    b = (k*((v2 - v5*v1)*b + k*(v5*v3-v2*v6)) /
-                         ((1 - v4*v1)*b + k*(v4*v3 - v6)))
+    radius = np.asarray(radius, dtype=float)
 
-            C[counter] = radius[0] / (1+1000*radius[0]*b)  # C in km
-            print("Finished {:.1f}%".format(
-                (counter+1)/periods.size*100), end='\r')
+    if kind == 'constant':
 
-        print('')
+        C = _c_response_constant(periods, sigma, radius, n)
 
         # if nargout > 1
         rho_a = 1e-7*8*np.pi**2 / periods * np.abs(C*1000)**2
-        phi = 90 + 57.3*np.angle(C)
-        Q = n/(n+1) * (1 - (n+1)*C/radius[0]) / (1 + n*C/radius[0])
 
     elif kind == 'quadratic':
 
-        radius = 1e3*np.asarray(radius, dtype=float)
+        C = _c_response_quadratic(periods, sigma, radius, n)
 
-        # constants
         mu = 4*np.pi*1e-7
-
         omega = 2*np.pi*1.0j/periods
 
-        # Number of layers
-        N = sigma.size
-        M = omega.size
-
-        # Preallocate
-        Y = np.zeros((M, N), dtype=complex)
-
-        # values for inner sphere, r = N (core)
-        qk = -omega*mu*radius[-1]
-        bk = np.sqrt((n+0.5)**2 - qk*sigma[-1]*radius[-1])
-        bkp = bk + 0.5
-        Y[:, -1] = -bkp/qk
-
-        # Loop over all layers above core (from core to surface)
-        # from before last (N-2) to first (0)
-        for k in range(N-2, -1, -1):
-            # Compute temporary scalars
-            qk = -omega*mu*radius[k]
-            bk = np.sqrt((n+0.5)**2 - qk*sigma[k]*radius[k])
-            bkp = bk + 0.5
-            bkm = bk - 0.5
-
-            etak = radius[k]/radius[k+1]
-            zetak = etak**(2*bk)
-
-            tauk = (1. - zetak) / (1. + zetak)
-            # handling of precision overflow due to high frequencies
-            tauk[np.isnan(tauk)] = -1.
-
-            qk = -omega*mu*radius[k]
-            qk1 = -omega*mu*radius[k+1]
-            qY = qk1*Y[:, k+1]
-
-            # Admittance for this layer
-            Y[:, k] = 1/qk*(qY*(bk-0.5*tauk)+bkp*bkm*tauk)/(bk+tauk*(0.5+qY))
-
-        # Compute the C-response (in km)
-        C = 1/(omega*mu*Y[:, 0])/1e3
-
         rho_a = mu*omega*np.abs(C*1000)**2  # rho_a in (Ohm*m)
-        phi = 90 + 57.3*np.angle(C)  # phase phi in degrees
-
-        # Q-response
-        Q = n/(n+1)*(1-(n+1)*C/(radius[0]/1e3))/(1+n*C/(radius[0]/1e3))
 
     else:
         raise ValueError(f'Unknown option "kind={kind}".')
 
+    phi = 90 + 57.3*np.angle(C)  # phase phi in degrees
+    Q = _q_from_c(C, n, radius[0])
+
     return C, rho_a, phi, Q
 
 
@@ -2135,8 +2876,8 @@ def q_response(frequency, nmax):
     """
 
     # load conductivity model
-    filepath = config_utils.basicConfig['file.Earth_conductivity']
-    sigma_model = np.loadtxt(filepath)
+    filepath = config_utils.basicConfig.resolve('file.Earth_conductivity')
+    sigma_model = _load_conductivity(filepath, os.path.getmtime(filepath))
 
     radius_ref = 6371.2  # reference radius in km
 
@@ -2152,12 +2893,56 @@ def q_response(frequency, nmax):
 
     periods = 1 / frequency[index]
 
+    print('Calculating Q-response for degrees 1 to {:}'.format(nmax))
+
+    # compute C-response for conductivity model and all degrees at once
+    n = np.arange(1, nmax+1).reshape(-1, 1)
+    C_n = _c_response_quadratic(periods, sigma, sigma_radius, n)
+
     q_response = np.zeros((nmax, frequency.size), dtype=complex)
-    for n in range(nmax):
-        print('Calculating Q-response for degree {:}'.format(n+1))
-        # compute Q-response for conductivity model and given degree n
-        C_n, rho_n, phi_n, Q_n = q_response_1D(
-            periods, sigma, sigma_radius, n+1, kind='quadratic')
-        q_response[n, index] = Q_n  # index 0: degree 1, index 1: degree 2, ...
+    # index 0: degree 1, index 1: degree 2, ...
+    q_response[:, index] = _q_from_c(C_n, n, sigma_radius[0])
 
     return q_response
+
+
+@lru_cache(maxsize=8)
+def _load_conductivity(filepath, mtime):
+    """
+    Conductivity model as loaded from the text file in ``filepath``.
+
+    The modification time ``mtime`` of the file is part of the cache key, so
+    that the file is parsed again after it has changed. The returned array is
+    read-only since it is shared between calls.
+
+    """
+
+    sigma_model = np.loadtxt(filepath)
+    sigma_model.setflags(write=False)
+
+    return sigma_model
+
+
+@lru_cache(maxsize=8)
+def _q_response_cached(N, step, nmax, filepath, mtime):
+    """
+    Q-response on the positive FFT frequencies as used in
+    :func:`rotate_gauss_fft`.
+
+    Results are cached with the number of samples, sample spacing (hours),
+    maximum degree, the filepath of the conductivity model and its
+    modification time ``mtime`` as key, so that an edited file is picked up.
+    The returned array is read-only since it is shared between calls.
+
+    """
+
+    # oscillations per second
+    frequency = (np.arange(int(N/2+1)) / N) / step / 3600
+
+    with config_utils.basicConfig.context('file.Earth_conductivity',
+                                          filepath):
+        q = q_response(frequency, nmax)
+
+    q.setflags(write=False)
+
+    return q
@@ -35,8 +35,21 @@ import hdf5storage as hdf
 import warnings
 import h5py
 import os
+import re
+import math
 import datetime as dt
 import textwrap
+from functools import lru_cache
+
+try:
+    import numba
+except ImportError:
+    HAS_NUMBA = False
+else:
+    HAS_NUMBA = True
+
+# epoch of the modified Julian date 2000
+_EPOCH = np.datetime64('2000-01-01', 'ns')
 
 
 def load_matfile(filepath, variable_names=None, **kwargs):
@@ -66,15 +79,25 @@ def load_matfile(filepath, variable_names=None, **kwargs):
 
     """
 
-    # define a recursively called function to traverse structure
-    def traverse_struct(struct):
+    output = hdf.loadmat(filepath, variable_names=variable_names, **kwargs)
+
+    # traverse the structure with an explicit stack of (parent, key, value),
+    # where the converted value is stored in parent[key]
+    stack = [(output, key, value) for key, value in output.items()
+             if not (key.startswith('__') and key.endswith('__'))]
+
+    while stack:
+        parent, key, struct = stack.pop()
+
+        # unwrap object arrays that only hold a single element
+        while (isinstance(struct, np.ndarray) and struct.dtype == np.dtype('O')
+               and struct.shape == (1, 1)):
+            struct = struct[0, 0]
 
         # for dictionaries, iterate through keys
         if isinstance(struct, dict):
-            out = dict()
-            for key, value in struct.items():
-                out[key] = traverse_struct(value)
-            return out
+            out = dict.fromkeys(struct)  # preserves the order of the keys
+            stack.extend((out, name, value) for name, value in struct.items())
 
         # for ndarray, iterate through dtype names
         elif isinstance(struct, np.ndarray):
@@ -82,30 +105,21 @@ def load_matfile(filepath, variable_names=None, **kwargs):
             # collect dtype names if available
             names = struct.dtype.names
 
-            # if no fields in array
-            if names is None:
-                if struct.dtype == np.dtype('O') and struct.shape == (1, 1):
-                    return traverse_struct(struct[0, 0])
-                else:
-                    return struct.squeeze()
+            if names is None:  # if no fields in array
+                out = struct.squeeze()
 
             else:  # if there are fields, iterate through fields
-                out = dict()
-                for name in names:
-                    out[name] = traverse_struct(struct[name])
-                return out
+                # index fields on a plain ndarray view, recarray is slow
+                if isinstance(struct, np.recarray):
+                    struct = struct.view(np.ndarray)
 
-        else:
-            return struct
+                out = dict.fromkeys(names)
+                stack.extend((out, name, struct[name]) for name in names)
 
-    output = hdf.loadmat(filepath, variable_names=variable_names, **kwargs)
-
-    # loadmat returns dictionary, go through keys and call traverse_struct
-    for key, value in output.items():
-        if key.startswith('__') and key.endswith('__'):
-            pass
         else:
-            output[key] = traverse_struct(value)
+            out = struct
+
+        parent[key] = out
 
     return output
 
@@ -158,15 +172,18 @@ def load_RC_datfile(filepath=None, parse_dates=None):
     column_types = {'time': 'float64', 'RC': 'float64', 'RC_e': 'float64',
                     'RC_i': 'float64', 'flag': 'category'}
 
-    df = pd.read_csv(filepath, sep=r'\s+', comment='#',
+    # whitespace separator is handled by the C parser (no regex engine)
+    df = pd.read_csv(filepath, sep=r'\s+', comment='#', engine='c',
                      dtype=column_types, names=column_names)
 
     parse_dates = False if parse_dates is None else parse_dates
 
-    # set datetime as index
+    # set datetime as index (nanoseconds since 2000-01-01 are computed
+    # directly, which avoids the generic parsing of pd.to_datetime)
     if parse_dates:
-        df.index = pd.to_datetime(
-            df['time'].values, unit='D', origin=pd.Timestamp('2000-1-1'))
+        ns = np.round(df['time'].values*86400e9).astype(np.int64)
+        df.index = pd.DatetimeIndex(
+            ns.view('timedelta64[ns]') + _EPOCH)
         df.drop(['time'], axis=1, inplace=True)  # delete redundant time column
 
     return df
@@ -188,7 +205,8 @@ def save_RC_h5file(filepath, read_from=None):
     -----
     Saves an HDF5-file of the RC index with keywords
     ['time', 'RC', 'RC_e', 'RC_i', 'flag']. Time is given in modified Julian
-    dates 2000.
+    dates 2000. The flag is stored as ``uint8`` codes into the byte strings
+    of the dataset attribute ``'categories'``.
 
     Examples
     --------
@@ -203,16 +221,27 @@ def save_RC_h5file(filepath, read_from=None):
     try:
         df_rc = load_RC_datfile(read_from, parse_dates=False)
 
+        # chunked storage with byte shuffling and gzip compression, which is
+        # transparent to readers of the file (chunks must not exceed the data)
+        filters = dict(chunks=(max(min(65536, df_rc.shape[0]), 1),),
+                       shuffle=True, compression='gzip', compression_opts=4)
+
         with h5py.File(filepath, 'w') as f:
 
             for column in df_rc.columns:
-                variable = df_rc[column].values
                 if column == 'flag':
-                    dset = f.create_dataset(column, variable.shape, dtype="S1")
-                    dset[:] = variable.astype('bytes')
+                    # categorical codes, decoded with the stored categories
+                    flag = df_rc[column].cat
+                    dset = f.create_dataset(
+                        column, data=flag.codes.to_numpy(dtype=np.uint8),
+                        **filters)
+                    dset.attrs['categories'] = np.asarray(
+                        flag.categories, dtype='S')
 
                 else:
-                    f.create_dataset(column, data=variable)  # just save floats
+                    # just save floats
+                    f.create_dataset(column, data=df_rc[column].values,
+                                     **filters)
 
             print(f'Successfully saved to {f.filename}.')
 
@@ -255,37 +284,30 @@ def load_shcfile(filepath, leap_year=None, comment=None):
 
     leap_year = True if leap_year is None else leap_year
     comment = '#' if comment is None else comment
+    comment = (comment,) if isinstance(comment, str) else comment
 
-    first_line = True
+    # matches blank lines and lines starting with a comment character
+    skip = re.compile(r'\s*(?:$|' + '|'.join(map(re.escape, comment)) + ')')
 
     with open(filepath, 'r') as f:
+        lines = [line for line in f if not skip.match(line)]
 
-        data = np.array([])
-        for line in f.readlines():
-
-            if line.strip().startswith(comment):
-                continue
-
-            newline = np.fromstring(line, sep=' ')
-
-            if first_line:  # first non-comment line contains shc params
-                name = os.path.split(filepath)[1]  # file name string
-                values = [name] + newline.astype(int).tolist()
-
-                first_line = False
+    # first non-comment line contains shc params
+    name = os.path.split(filepath)[1]  # file name string
+    values = [name] + np.fromstring(lines[0], sep=' ').astype(int).tolist()
 
-            else:
-                data = np.append(data, newline)
+    # parse the numeric block (time row and coefficient table) in one pass
+    data = np.fromstring(''.join(lines[1:]), sep=' ')
 
-        # unpack parameter line
-        keys = ['SHC', 'nmin', 'nmax', 'N', 'order', 'step']
-        parameters = dict(zip(keys, values))
+    # unpack parameter line
+    keys = ['SHC', 'nmin', 'nmax', 'N', 'order', 'step']
+    parameters = dict(zip(keys, values))
 
-        time = data[:parameters['N']]
-        coeffs = data[parameters['N']:].reshape((-1, parameters['N']+2))
-        coeffs = coeffs[:, 2:].copy()  # discard columns with n and m
+    time = data[:parameters['N']]
+    coeffs = data[parameters['N']:].reshape((-1, parameters['N']+2))
+    coeffs = coeffs[:, 2:].copy()  # discard columns with n and m
 
-        mjd = dyear_to_mjd(time, leap_year=leap_year)
+    mjd = dyear_to_mjd(time, leap_year=leap_year)
 
     return mjd, coeffs, parameters
 
@@ -323,7 +345,7 @@ def save_shcfile(time, coeffs, order=None, filepath=None, nmin=None, nmax=None,
         Use ``header=False`` if no header should be included.
     """
 
-    time = np.asarray(time, dtype=float)
+    time = np.array(time, dtype=float, ndmin=1)
 
     order = 1 if order is None else int(order)
 
@@ -347,13 +369,12 @@ def save_shcfile(time, coeffs, order=None, filepath=None, nmin=None, nmax=None,
     coeffs = coeffs[:, (nmin**2-1):((nmax+1)**2-1)]
 
     # compute all possible degree and orders
-    deg = np.array([], dtype=int)
-    ord = np.array([], dtype=int)
-    for n in range(nmin, nmax+1):
-        deg = np.append(deg, np.repeat(n, 2*n+1))
-        ord = np.append(ord, [0])
-        for m in range(1, n+1):
-            ord = np.append(ord, [m, -m])
+    degrees = np.arange(nmin, nmax+1)
+    deg = np.repeat(degrees, 2*degrees+1)
+
+    # position within each degree maps to the orders 0, 1, -1, 2, -2, ...
+    k = np.arange(deg.size) - (deg**2 - nmin**2)
+    ord = (k + 1)//2 * np.where(k % 2, 1, -1)
 
     if (header is None) or (header is True):
         header = textwrap.dedent(f"""\
@@ -372,20 +393,14 @@ def save_shcfile(time, coeffs, order=None, filepath=None, nmin=None, nmax=None,
         f.write(header)
         f.write(parameter_line)
 
-        f.write(f'{"":4s} {"":4s}')  # to represent the two columns for n and m
-        for t in time:
-            f.write(' {:16.8f}'.format(mjd_to_dyear(t, leap_year=leap_year)))
-        f.write('\n')
+        # blanks to represent the two columns for n and m
+        dyear = mjd_to_dyear(time, leap_year=leap_year)
+        f.write(f'{"":4s} {"":4s}' + ''.join(
+            ' {:16.8f}'.format(value) for value in dyear) + '\n')
 
         # write coefficient table to 8 significants
-        for row, (n, m) in enumerate(zip(deg, ord)):
-
-            f.write('{:4d} {:4d}'.format(n, m))
-
-            for value in coeffs[:, row]:
-                f.write(' {:16.8f}'.format(value))
-
-            f.write('\n')
+        np.savetxt(f, np.column_stack((deg, ord, coeffs.T)),
+                   fmt=['%4d', '%4d'] + ['%16.8f']*time.size, delimiter=' ')
 
     print('Created SHC-file {}.'.format(
         os.path.join(os.getcwd(), filepath)))
@@ -451,15 +466,24 @@ datetime.datetime(2002, 3, 4)])
         datetime = year.astype('datetime64[ns]')
 
     else:
-        # build iso datetime string with str_ (supported in NumPy >= 2.0)
-        year = np.asarray(year, dtype=np.str_)
-        month = np.char.zfill(np.asarray(month, dtype=np.str_), 2)
-        day = np.char.zfill(np.asarray(day, dtype=np.str_), 2)
+        month = np.asarray(month)
+        day = np.asarray(day)
 
-        year_month = np.char.add(np.char.add(year, '-'), month)
-        datetime = np.char.add(np.char.add(year_month, '-'), day)
+        if all(np.issubdtype(x.dtype, np.integer) for x in (year, month, day)):
+            # integer dates: count days with integer arithmetic
+            days = _days_since_2000(year, month, day)
+            datetime = np.asarray(days, dtype='timedelta64[D]') + _EPOCH
 
-        datetime = datetime.astype('datetime64[ns]')
+        else:
+            # build iso datetime string with str_ (supported in NumPy >= 2.0)
+            year = np.asarray(year, dtype=np.str_)
+            month = np.char.zfill(np.asarray(month, dtype=np.str_), 2)
+            day = np.char.zfill(np.asarray(day, dtype=np.str_), 2)
+
+            year_month = np.char.add(np.char.add(year, '-'), month)
+            datetime = np.char.add(np.char.add(year_month, '-'), day)
+
+            datetime = datetime.astype('datetime64[ns]')
 
         # not use iadd here because it doesn't broadcast arrays
         datetime = (datetime + np.asarray(hour, dtype='timedelta64[h]')
@@ -468,11 +492,57 @@ datetime.datetime(2002, 3, 4)])
                     + np.asarray(microsecond, dtype='timedelta64[us]')
                     + np.asarray(nanosecond, dtype='timedelta64[ns]'))
 
-    nanoseconds = datetime - np.datetime64('2000-01-01', 'ns')
+    nanoseconds = datetime - _EPOCH
 
     return nanoseconds / np.timedelta64(1, 'D')  # fraction of days
 
 
+def _days_since_2000(year, month, day):
+    """
+    Number of days from January 1, 2000 to the given dates of the proleptic
+    Gregorian calendar (integer arrays, Fliegel & Van Flandern algorithm).
+
+    """
+
+    year, month, day = (np.asarray(x, dtype=np.int64)
+                        for x in (year, month, day))
+
+    if np.any((month < 1) | (month > 12)):
+        raise ValueError('Month out of range, expected values in [1, 12].')
+
+    # days in each month, February with leap day
+    days_in_month = np.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+    last_day = days_in_month[month - 1] + ((month == 2) & is_leap_year(year))
+
+    if np.any((day < 1) | (day > last_day)):
+        raise ValueError('Day out of range for the given month.')
+
+    a = (14 - month) // 12
+    y = year + 4800 - a
+    m = month + 12*a - 3
+
+    # julian day number minus that of January 1, 2000
+    return (day + (153*m + 2) // 5 + 365*y + y//4 - y//100 + y//400
+            - 32045 - 2451545)
+
+
+def _year_from_days(days):
+    """
+    Year of the proleptic Gregorian calendar from integer days since
+    January 1, 2000 (inverse of the Fliegel & Van Flandern algorithm).
+
+    """
+
+    a = np.asarray(days, dtype=np.int64) + 2451545 + 32044
+    b = (4*a + 3) // 146097
+    c = a - (146097*b) // 4
+    d = (4*c + 3) // 1461
+    e = c - (1461*d) // 4
+    m = (5*e + 2) // 153
+
+    return 100*b + d - 4800 + m//10
+
+
 def timestamp(time):
     """
     Convert modified Julian date to NumPy's datetime format.
@@ -498,11 +568,12 @@ def timestamp(time):
 
     """
 
-    # convert mjd2000 to timedelta64[ns]
-    ns = np.asarray(time) * 86400e9 * np.timedelta64(1, 'ns')
+    # convert mjd2000 to timedelta64[ns], rounded to the nearest nanosecond
+    ns = np.rint(np.asarray(time, dtype=np.float64)*86400e9).astype(
+        'timedelta64[ns]')
 
     # add datetime offset with ns precision
-    return ns + np.datetime64('2000-01-01', 'ns')
+    return ns + _EPOCH
 
 
 def is_leap_year(year):
@@ -537,9 +608,12 @@ def is_leap_year(year):
                         'numpy.floor to extract the integer year '
                         'from decimal years.')
 
-    return np.logical_and(np.remainder(year, 4) == 0,
-                          np.logical_or(np.remainder(year, 100) != 0,
-                                        np.remainder(year, 400) == 0))
+    # divisible by 4 and not by 100 unless by 400, where for multiples of 4 the
+    # test for 100 reduces to 25 and the test for 400 to 16 (bit masks)
+    leap = (year & 3) == 0
+    leap &= (year % 25 != 0) | (year & 15 == 0)
+
+    return leap
 
 
 def dyear_to_mjd(time, leap_year=None):
@@ -575,15 +649,20 @@ def dyear_to_mjd(time, leap_year=None):
     leap_year = True if leap_year is None else leap_year
 
     if leap_year:
-        year = np.asarray(np.floor(time), dtype=int)  # note: -0.1 is year -1
-        frac_of_year = np.remainder(time, 1.)
+        if HAS_NUMBA:
+            # compiled elementwise conversion without temporary arrays
+            return _dyear_to_mjd_kernel(time)
+
+        time = np.asarray(time, dtype=np.float64)
+        year = np.floor(time)  # note: -0.1 is year -1
 
-        isleap = is_leap_year(year)  # do provide integer years
-        days_per_year = np.where(isleap, 366., 365.)
+        frac_of_year = time - year  # exact, same as np.remainder(time, 1.)
+        year = year.astype(np.int64)
 
+        days_per_year = 365 + is_leap_year(year)  # do provide integer years
         days = frac_of_year * days_per_year
 
-        mjd = mjd2000(year, 1, 1) + days
+        mjd = _days_since_2000(year, 1, 1) + days
 
     elif not leap_year:
         days_per_year = 365.25
@@ -632,14 +711,17 @@ def mjd_to_dyear(time, leap_year=None):
     leap_year = True if leap_year is None else leap_year
 
     if leap_year:
-        date = (np.asarray(np.floor(time), dtype=int)*np.timedelta64(1, 'D')
-                + np.datetime64('2000-01-01'))  # only precise to date
+        if HAS_NUMBA:
+            # compiled elementwise conversion without temporary arrays
+            return _mjd_to_dyear_kernel(time)
+
+        time = np.asarray(time)
 
-        year = date.astype('datetime64[Y]').astype(int) + 1970
-        days = np.asarray(time) - mjd2000(year, 1, 1)  # days of that year
+        year = _year_from_days(np.floor(time))  # only precise to date
+        days = time - _days_since_2000(year, 1, 1)  # days of that year
 
         isleap = is_leap_year(year)
-        days_per_year = np.where(isleap, 366., 365.)
+        days_per_year = 365. + isleap
 
         dyear = year + days / days_per_year
 
@@ -652,6 +734,84 @@ def mjd_to_dyear(time, leap_year=None):
     return dyear
 
 
+def _first_day_of_year(year):
+    """
+    Days from January 1, 2000 to January 1 of the given integer year (same as
+    :func:`_days_since_2000` with month and day equal to 1).
+
+    """
+
+    y = year + 4799
+
+    return 307 + 365*y + y//4 - y//100 + y//400 - 32045 - 2451545
+
+
+def _is_leap_year_scalar(year):
+    """
+    Same as :func:`is_leap_year` for a single integer year.
+
+    """
+
+    return (year & 3 == 0) and (year % 25 != 0 or year & 15 == 0)
+
+
+def _dyear_to_mjd_kernel(time, mjd):
+    """
+    Elementwise :func:`dyear_to_mjd` accounting for leap years, compiled as
+    generalized ufunc.
+
+    """
+
+    if not math.isfinite(time):
+        mjd[0] = math.nan
+        return
+
+    year = math.floor(time)  # note: -0.1 is year -1
+    frac_of_year = time - year
+
+    days_per_year = 365 + _is_leap_year_scalar(year)
+
+    mjd[0] = _first_day_of_year(year) + frac_of_year*days_per_year
+
+
+def _mjd_to_dyear_kernel(time, dyear):
+    """
+    Elementwise :func:`mjd_to_dyear` accounting for leap years, compiled as
+    generalized ufunc.
+
+    """
+
+    if not math.isfinite(time):
+        dyear[0] = time
+        return
+
+    # inverse of the Fliegel & Van Flandern algorithm as in _year_from_days
+    a = math.floor(time) + 2451545 + 32044
+    b = (4*a + 3) // 146097
+    c = a - (146097*b) // 4
+    d = (4*c + 3) // 1461
+    e = c - (1461*d) // 4
+    m = (5*e + 2) // 153
+
+    year = 100*b + d - 4800 + m//10
+    days = time - _first_day_of_year(year)  # days of that year
+
+    days_per_year = 365 + _is_leap_year_scalar(year)
+
+    dyear[0] = year + days/days_per_year
+
+
+if HAS_NUMBA:
+    _first_day_of_year = numba.njit(cache=True)(_first_day_of_year)
+    _is_leap_year_scalar = numba.njit(cache=True)(_is_leap_year_scalar)
+    _dyear_to_mjd_kernel = numba.guvectorize(
+        ['void(float64, float64[:])'], '()->()',
+        target='parallel', cache=True)(_dyear_to_mjd_kernel)
+    _mjd_to_dyear_kernel = numba.guvectorize(
+        ['void(float64, float64[:])'], '()->()',
+        target='parallel', cache=True)(_mjd_to_dyear_kernel)
+
+
 def memory_usage(pandas_obj):
     """
     Compute memory usage of pandas object.
@@ -699,11 +859,17 @@ def gauss_units(deriv=None):
 
     deriv = 0 if deriv is None else deriv
 
+    return _gauss_units(deriv)
+
+
+@lru_cache(maxsize=16, typed=True)  # typed, since 2.0 is formatted as '2.0'
+def _gauss_units(deriv):
+
     if deriv == 0:
         units = 'nT'
     elif deriv == 1:
         units = '$\\mathrm{{nT}}/\\mathrm{{yr}}$'
     else:
-        units = '$\\mathrm{{nT}}/\\mathrm{{yr}}^{{{:}}}$'.format(deriv)
+        units = f'$\\mathrm{{nT}}/\\mathrm{{yr}}^{{{deriv}}}$'
 
     return units
@@ -283,7 +283,7 @@ def plot_coastlines(ax, **kwargs):
     """
 
     # load shapefile with the coastline
-    shp = config_utils.basicConfig['file.shp_coastline']
+    shp = config_utils.basicConfig.resolve('file.shp_coastline')
 
     with shapefile.Reader(shp) as sf:
 
@@ -334,6 +334,21 @@ class CoordinateUtils(TestCase):
 
         self.assertEqual(matrix.shape, (3, 3, 24, 8))
 
+    def test_rotate_gauss_single(self):
+
+        time = np.linspace(0., 100., 11)
+        nmax = 4
+        kmax = 2
+
+        base_1, base_2, base_3 = cpc.basevectors_gsm(time)
+        desired = cpc.rotate_gauss(nmax, kmax, base_1, base_2, base_3)
+        matrix = cpc.rotate_gauss(nmax, kmax, base_1, base_2, base_3,
+                                  precision='single')
+
+        self.assertEqual(matrix.dtype, np.float64)
+        self.assertIsNone(np.testing.assert_allclose(
+            matrix, desired, atol=1e-6))
+
     def test_cartesian_to_spherical(self):
 
         x = -1.0
@@ -88,6 +88,25 @@ class DataUtils(TestCase):
         desired = 31. + np.arange(3)/24
         np.testing.assert_allclose(actual, desired)
 
+    def test_mjd2000_integer_dates(self):
+        """
+        Compare integer arithmetic with datetime, also for invalid dates.
+        """
+
+        days = np.random.randint(-50000, 50000, size=(100,))
+
+        dates = [datetime(2000, 1, 1) + timedelta(days=int(day))
+                 for day in days]
+
+        actual = cpd.mjd2000([d.year for d in dates], [d.month for d in dates],
+                             [d.day for d in dates])
+        np.testing.assert_equal(actual, days)
+
+        self.assertEqual(cpd.mjd2000(2000, 2, 29), 59.)
+        self.assertRaises(ValueError, cpd.mjd2000, 2001, 2, 29)
+        self.assertRaises(ValueError, cpd.mjd2000, 2000, 13, 1)
+        self.assertRaises(ValueError, cpd.mjd2000, 2000, 4, 31)
+
     def test_mjd_to_dyear(self):
 
         self.assertEqual(cpd.mjd_to_dyear(0.0), 2000.0)
@@ -102,6 +121,11 @@ class DataUtils(TestCase):
         self.assertEqual(cpd.mjd_to_dyear(3*365.25, leap_year=False), 2003.0)
         self.assertEqual(cpd.mjd_to_dyear(4*365.25, leap_year=False), 2004.0)
 
+        # first day of each year maps onto the integer year
+        years = np.arange(1800, 2200)
+        np.testing.assert_equal(cpd.mjd_to_dyear(cpd.mjd2000(years, 1, 1)),
+                                years)
+
 
 if __name__ == '__main__':
     main()